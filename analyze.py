@@ -1,35 +1,40 @@
-import random
-import numpy as np
-from utils import io
-from globals import *
+import os
+import argparse
+import matplotlib.pyplot as plt
 from globals import load_config
-from dataframes.subject import Subject
-from dataframes.curriculum import Curriculum
-from ga.genetic_algorithm import GeneticAlgorithm, ProblemContext
-from nsga.nsga import NSGA2
+from nsga.front_merger import FrontMerger, TXT_CHUNK_SIZE
 
 if __name__ == '__main__':
-    subjects = Subject("csv/subjects.csv")
-    curriculum = Curriculum("csv/curriculum.csv", subjects.df)
-    config = load_config()
+    parser = argparse.ArgumentParser(description="Merge saved Pareto fronts into one global front and plot it")
+    parser.add_argument("paths", nargs="*", default=["all_pareto_fronts"], help="archives or folders of archives/.txt chromosomes")
+    parser.add_argument("--room-count", type=int, default=16)
+    parser.add_argument("--chunk-size", type=int, default=TXT_CHUNK_SIZE, help=".txt chromosomes evaluated per batch")
+    parser.add_argument("--output", type=str, default="merged_pareto_front")
+    args = parser.parse_args()
 
-    context = ProblemContext(
-        curriculum=curriculum,
-        time_slot_indices=list(range(15)),
-        room_indices=list(range(16)),
-        config=config,
-    )
-
-    seed = io.import_all_txt_arrays("all_pareto_fronts")
+    config = load_config().select_rooms(list(range(args.room_count)))
+    merger = FrontMerger(config).merge(args.paths, args.chunk_size)
+    merger.save(args.output)
 
-    nsga = NSGA2(
-        context=context,
-        population_size=1026,
-        max_generation=10,
-        crossover_rate=0.7,
-        mutation_rate=0.1,
-        mutation_points=MUTATION_POINTS,
-        seed=seed
+    report = merger.report()
+    print(
+        f"Read {report['read']} chromosomes from {len(report['sources'])} sources: "
+        f"{report['duplicates']} duplicates, {report['infeasible']} infeasible, {report['dominated']} dominated"
     )
+    print(f"Global Pareto front: {report['front']} genomes, hypervolume {report['hypervolume']:.1f}")
+    print("Ranks against the front when merged: " + ", ".join(f"{rank}: {count}" for rank, count in report["merge_ranks"].items()))
+    for source, counts in report["sources"].items():
+        if counts["in_front"]:
+            print(f"  {source}: {counts['in_front']} of {counts['read']}")
 
-    nsga.plot_objective_space(connect_by_rank=True)
\ No newline at end of file
+    fig, ax = plt.subplots(figsize=(8, 6))
+    order = merger.objectives[:, 0].argsort()
+    ax.plot(merger.objectives[order, 0], merger.objectives[order, 1], linestyle='--', linewidth=1, color='black')
+    ax.scatter(merger.objectives[:, 0], merger.objectives[:, 1], color='blue', edgecolor='k', s=60)
+    ax.set_xlabel('Average Distance (m)')
+    ax.set_ylabel('Average Size (m^2)')
+    ax.set_title('Global Pareto Front')
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(os.path.join(args.output, "front.png"))
+    plt.close(fig)
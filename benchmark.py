@@ -0,0 +1,255 @@
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import contextlib
+import numpy as np
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from globals import MUTATION_POINTS, load_config
+from dataframes.subject import Subject
+from dataframes.curriculum import Curriculum
+from ga import generator
+from ga.genome import Genome
+from ga.constraint_checker import ConstraintChecker
+from ga.crossover_operator import CrossoverOperator
+from ga.mutation_operator import MutationOperator
+from ga.fitness_cache import fitness_cache
+from ga.genetic_algorithm import ProblemContext
+from nsga.non_dominated_sorting import NonDominatedSorting
+from nsga.crowding_distance import CrowdingDistance
+from nsga.nsga import NSGA2
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    time_slots: int
+    rooms: int
+    population_size: Optional[int]
+    calls: int
+    failures: int
+    total: float
+    mean: float
+    median: float
+    best: float
+
+    @property
+    def key(self) -> Tuple:
+        return self.name, self.time_slots, self.rooms, self.population_size
+
+def parse_scale(text: str) -> Tuple[int, int]:
+    # "TxR", e.g. 15x16 for 15 time slots and 16 rooms
+    t, r = text.lower().split("x")
+    return int(t), int(r)
+
+def seed_rngs(seed: int):
+    np.random.seed(seed)
+    random.seed(seed)
+
+def measure(fn: Callable[[int], object], calls: int) -> Tuple[List[float], int]:
+    # fn gets the call index; exceptions are counted, not timed
+    timings = []
+    failures = 0
+    for i in range(calls):
+        start = time.perf_counter()
+        try:
+            fn(i)
+        except Exception:
+            failures += 1
+            continue
+        timings.append(time.perf_counter() - start)
+    return timings, failures
+
+class Benchmark:
+    def __init__(self, seed: int, samples: int, generations: int, csv_folder: str = "csv"):
+        self.seed = seed
+        self.samples = samples
+        self.generations = generations
+
+        subjects = Subject(f"{csv_folder}/subjects.csv")
+        self.curriculum = Curriculum(f"{csv_folder}/curriculum.csv", subjects.df)
+        self.config = load_config(
+            subjects_csv=f"{csv_folder}/subjects.csv",
+            curriculum_csv=f"{csv_folder}/curriculum.csv",
+            rooms_csv=f"{csv_folder}/rooms.csv",
+        )
+        self.results: List[BenchmarkResult] = []
+
+    def record(self, name: str, scale: Tuple[int, int], population_size: Optional[int], fn: Callable[[int], object], calls: int):
+        seed_rngs(self.seed)
+        # Operators print progress and constraint violations; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings, failures = measure(fn, calls)
+
+        timings = timings or [float("nan")]
+        result = BenchmarkResult(
+            name=name,
+            time_slots=scale[0],
+            rooms=scale[1],
+            population_size=population_size,
+            calls=calls,
+            failures=failures,
+            total=float(np.nansum(timings)),
+            mean=float(np.mean(timings)),
+            median=float(np.median(timings)),
+            best=float(np.min(timings)),
+        )
+        self.results.append(result)
+        print(format_row(result), flush=True)
+
+    def run_scale(self, scale: Tuple[int, int], population_sizes: List[int]):
+        T, R = scale
+        context = ProblemContext(
+            curriculum=self.curriculum,
+            time_slot_indices=list(range(T)),
+            room_indices=list(range(R)),
+            config=self.config,
+        )
+        config = self.config.select_rooms(context.room_indices)
+
+        # Per-operator timings, independent of the population size
+        chromosomes = []
+
+        def generate(_):
+            chromosomes.append(generator.generate_valid_guess(self.curriculum, context.time_slot_indices, context.room_indices, config))
+
+        self.record("generate_valid_guess", scale, None, generate, self.samples)
+        seed_rngs(self.seed)
+        while len(chromosomes) < max(self.samples, 2):
+            chromosomes.append(generator.generate_valid_guess(self.curriculum, context.time_slot_indices, context.room_indices, config))
+
+        operator = CrossoverOperator(config)
+        pair = lambda i: (chromosomes[i % len(chromosomes)], chromosomes[(i + 1) % len(chromosomes)])
+        self.record("column_based_crossover", scale, None, lambda i: operator.column_based_crossover(*pair(i)), self.samples)
+        self.record("row_based_crossover", scale, None, lambda i: operator.row_based_crossover(*pair(i)), self.samples)
+
+        pick = lambda i: chromosomes[i % len(chromosomes)]
+        self.record("random_swap", scale, None, lambda i: MutationOperator(pick(i).copy(), MUTATION_POINTS).random_swap(), self.samples)
+        self.record("validate", scale, None, lambda i: ConstraintChecker(pick(i).copy(), config, verbose=False).validate(), self.samples)
+
+        # Fresh genomes with the memo off, so every call is a full evaluation
+        capacity = fitness_cache.capacity
+        fitness_cache.resize(0)
+        try:
+            self.record("get_objectives", scale, None, lambda i: Genome(pick(i), config).get_objectives(), self.samples)
+        finally:
+            fitness_cache.resize(capacity)
+
+        for population_size in population_sizes:
+            self.run_population(context, config, scale, population_size)
+
+    def run_population(self, context: ProblemContext, config, scale: Tuple[int, int], population_size: int):
+        seed_rngs(self.seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            population = [
+                Genome.from_generator(self.curriculum, context.time_slot_indices, context.room_indices, config)
+                for _ in range(population_size)
+            ]
+            objectives = np.array([genome.get_objectives() for genome in population], dtype=float)
+
+        sorter = NonDominatedSorting(population, objectives)
+        fronts = sorter.run()
+        front_objectives = [objectives[indices] for indices in sorter.front_indices]
+
+        self.record("non_dominated_sorting", scale, population_size, lambda _: NonDominatedSorting(population, objectives).run(), self.samples)
+        self.record(
+            "crowding_distance", scale, population_size,
+            lambda _: [CrowdingDistance(front, obj).assign() for front, obj in zip(fronts, front_objectives)],
+            self.samples,
+        )
+
+        fitness_cache.clear()
+        with tempfile.TemporaryDirectory() as folder:
+            seed_rngs(self.seed)
+            with contextlib.redirect_stdout(io.StringIO()):
+                nsga = NSGA2(
+                    context=context,
+                    population_size=population_size,
+                    max_generation=self.generations,
+                    crossover_rate=0.8,
+                    mutation_rate=0.2,
+                    mutation_points=MUTATION_POINTS,
+                    seed=[genome.chromosome.copy() for genome in population],
+                    population_folder=folder,
+                )
+                nsga.non_dominated_sorting()
+            try:
+                self.record("nsga2_evolve", scale, population_size, lambda _: nsga.evolve(), self.generations)
+            finally:
+                nsga.exporter.close()
+
+def format_row(result: BenchmarkResult) -> str:
+    population = "-" if result.population_size is None else str(result.population_size)
+    return (
+        f"{result.name:<24} {result.time_slots:>3}x{result.rooms:<4} {population:>6} "
+        f"{result.calls:>6} {result.failures:>5} {result.mean * 1e3:>10.3f} {result.median * 1e3:>10.3f} {result.best * 1e3:>10.3f}"
+    )
+
+def print_header():
+    print(f"{'benchmark':<24} {'scale':>8} {'pop':>6} {'calls':>6} {'fail':>5} {'mean ms':>10} {'median ms':>10} {'best ms':>10}")
+
+def compare(results: List[BenchmarkResult], baseline_path: str, tolerance: float) -> List[str]:
+    # Median-to-median ratios against a previous JSON report
+    with open(baseline_path) as f:
+        baseline = {
+            (r["name"], r["time_slots"], r["rooms"], r["population_size"]): r
+            for r in json.load(f)["results"]
+        }
+
+    regressions = []
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%})")
+    for result in results:
+        previous = baseline.get(result.key)
+        if previous is None or not previous["median"]:
+            continue
+        ratio = result.median / previous["median"]
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{result.name:<24} {result.time_slots:>3}x{result.rooms:<4} {str(result.population_size or '-'):>6} {ratio:>8.2f}x {flag}")
+        if flag:
+            regressions.append(result.name)
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the GA/NSGA-II hot paths at several problem scales and population sizes")
+    parser.add_argument("--scales", nargs="+", default=["15x16", "15x32", "25x64"], help="problem scales as TIMESLOTSxROOMS")
+    parser.add_argument("--population-sizes", nargs="+", type=int, default=[50, 100, 200])
+    parser.add_argument("--samples", type=int, default=50, help="calls per operator benchmark")
+    parser.add_argument("--generations", type=int, default=5, help="NSGA2.evolve calls per population size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", type=str, default="csv", help="folder with subjects.csv, curriculum.csv and rooms.csv")
+    parser.add_argument("--output", type=str, default="benchmark.json")
+    parser.add_argument("--compare", type=str, default=None, help="previous JSON report to compare medians against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a regression is reported")
+    args = parser.parse_args()
+
+    benchmark = Benchmark(args.seed, args.samples, args.generations, args.csv)
+    print_header()
+    for scale in args.scales:
+        benchmark.run_scale(parse_scale(scale), args.population_sizes)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "samples": args.samples,
+            "generations": args.generations,
+            "csv": args.csv,
+        },
+        "results": [asdict(result) for result in benchmark.results],
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        regressions = compare(benchmark.results, args.compare, args.tolerance)
+        if regressions:
+            sys.exit(1)
@@ -1,24 +1,14 @@
-import os
-import glob
-import shutil
+import argparse
+from utils.front_store import FrontStore
 
-root_dir = 'simulation'
-target_dir = 'all_pareto_fronts'
-os.makedirs(target_dir, exist_ok=True)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ingest the Pareto fronts of simulation/run_* into one front store")
+    parser.add_argument("--root", type=str, default="simulation")
+    parser.add_argument("--output", type=str, default="all_pareto_fronts")
+    parser.add_argument("--workers", type=int, default=None, help="processes reading run folders (default: all cores)")
+    args = parser.parse_args()
 
-# Limit to run_1 through run_50
-for i in range(1, 51):
-    run_folder = f'run_{i}'
-    pareto_path = os.path.join(root_dir, run_folder, 'pareto_front')
-    if os.path.isdir(pareto_path):
-        txt_files = glob.glob(os.path.join(pareto_path, '*.txt'))
-        for file_path in txt_files:
-            base_name = os.path.basename(file_path)
-            new_name = f"{run_folder}_{base_name}"
-            new_path = os.path.join(target_dir, new_name)
-            try:
-                shutil.copy(file_path, new_path)
-            except Exception as e:
-                print(f"Error copying {file_path}: {e}")
-
-print("Selected Pareto front files have been collected.")
+    store = FrontStore(args.output)
+    runs = store.ingest(args.root, args.workers)
+    index = store.load_index()
+    print(f"Ingested {len(runs)} new runs; the store holds {len(index)} front members from {index['run_id'].nunique()} runs.")
@@ -0,0 +1,112 @@
+import math
+import numpy as np
+from typing import Tuple
+from globals import SLOTS_PER_DAY, Configuration
+from utils.helper import decode_chromosome, get_twin_values
+from ga.parallel_class import ParallelClass
+
+INFEASIBLE_DISTANCE = 1000.0
+INFEASIBLE_SIZE = 0.0
+
+class BatchEvaluator:
+    """Evaluate a stacked (N, T, R) population in one vectorized pass.
+
+    Produces the same verdict as ConstraintChecker.validate and the same
+    objectives as Genome.calculate_average_distance/calculate_average_size.
+    """
+
+    def __init__(self, config: Configuration):
+        self.config = config
+        self.sizes = config.size_vector
+        self.distance_units = config.distance_units
+        self.distance_step = config.distance_step
+
+        # Subject code -> column of the parallel combination matrix
+        subject_ids = sorted(config.subject_ids)
+        self.subject_index = np.full(max(subject_ids) + 1, -1, dtype=np.int64)
+        self.subject_index[subject_ids] = np.arange(len(subject_ids))
+        self.combinations = ParallelClass.combinations(config.parallel_counts)
+        self.max_parallels = max(config.parallel_counts)
+
+    def evaluate(self, chromosomes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return an (N, 2) objective matrix and an (N,) feasibility mask."""
+        N = chromosomes.shape[0]
+        objectives = np.empty((N, 2), dtype=float)
+        objectives[:, 0] = INFEASIBLE_DISTANCE
+        objectives[:, 1] = INFEASIBLE_SIZE
+
+        feasible = self.check_constraints(chromosomes)
+        if feasible.any():
+            valid = chromosomes[feasible]
+            objectives[feasible, 0] = self.average_distance(valid)
+            objectives[feasible, 1] = self.average_size(valid)
+
+        return objectives, feasible
+
+    def check_constraints(self, chromosomes: np.ndarray) -> np.ndarray:
+        N, T, R = chromosomes.shape
+        arr = chromosomes.astype(np.int64)
+        occupied = arr != 0
+
+        # Frequency
+        feasible = np.count_nonzero(occupied, axis=(1, 2)) == self.config.total_duration
+
+        # Subject session per day: first occurrence of the twin on the same day
+        stride = int(arr.max()) + 2
+        offsets = (np.arange(N) * stride)[:, None, None]
+        values, first_index = np.unique((arr + offsets).ravel(), return_index=True)
+        twins = get_twin_values(arr) + offsets
+        pos = np.clip(np.searchsorted(values, twins), 0, len(values) - 1)
+        has_twin = occupied & (values[pos] == twins)
+        twin_day = (first_index[pos] % (T * R)) // R // SLOTS_PER_DAY
+        day = (np.arange(T) // SLOTS_PER_DAY)[None, :, None]
+        feasible &= ~np.any(has_twin & (twin_day == day), axis=(1, 2))
+
+        # Time constraint: one subject per time slot
+        subjects, _, _ = decode_chromosome(arr)
+        lowest = np.where(occupied, subjects, np.iinfo(np.int64).max).min(axis=2)
+        highest = np.where(occupied, subjects, -1).max(axis=2)
+        feasible &= ~np.any(occupied.any(axis=2) & (lowest != highest), axis=1)
+
+        return feasible
+
+    def average_distance(self, chromosomes: np.ndarray) -> np.ndarray:
+        N, T, R = chromosomes.shape
+        arr = chromosomes.astype(np.int64)
+        subjects, parallels, _ = decode_chromosome(arr)
+
+        # Room of every parallel in every time slot: (N, T, P), -1 if empty
+        n_idx, t_idx, c_idx = np.nonzero(arr)
+        rooms = np.full((N, T, self.max_parallels), -1, dtype=np.int64)
+        rooms[n_idx, t_idx, parallels[n_idx, t_idx, c_idx] - 1] = c_idx
+
+        row_subject = self.subject_index[subjects.max(axis=2)]
+        occupied = row_subject >= 0
+        same_day = ((np.arange(1, T) % SLOTS_PER_DAY) != 0)[None, :]
+
+        total = np.zeros(N)
+        for combination in self.combinations:
+            selected = np.where(occupied, combination[row_subject], 0)
+            config_rooms = np.take_along_axis(rooms, selected[..., None], axis=2)[..., 0]
+            config_rooms[~occupied] = -1
+
+            a = config_rooms[:, :-1]
+            b = config_rooms[:, 1:]
+            adjacent = same_day & (a != -1) & (b != -1)
+
+            units = np.where(adjacent, self.distance_units[a, b], 0)
+            pair_counts = adjacent.sum(axis=1)
+            total += np.divide(
+                units.sum(axis=1).astype(float), pair_counts,
+                out=np.zeros(N), where=pair_counts > 0
+            ) * self.distance_step
+
+        return total / len(self.combinations)
+
+    def average_size(self, chromosomes: np.ndarray) -> np.ndarray:
+        # Only the first parallel configuration is measured
+        # Correctly rounded sums, as in the other evaluation paths
+        _, parallels, _ = decode_chromosome(chromosomes)
+        first = (chromosomes != 0) & (parallels == 1)
+        cols = [np.nonzero(mask)[1] for mask in first]
+        return np.array([math.fsum(self.sizes[c].tolist()) / len(c) for c in cols])
@@ -1,7 +1,8 @@
 import numpy as np
-from typing import List, Any
+from typing import List, Any, Optional
 from utils import io
-from utils.helper import get_twin, locate_twin, is_schedule_violated
+from utils.helper import decode_chromosome, get_twin_values
+from ga.gene_index import GeneIndex
 from globals import SLOTS_PER_DAY, Configuration
 
 class ConstraintChecker:
@@ -22,6 +23,14 @@ class ConstraintChecker:
 
         self.verbose = verbose
         self.faulty: List[Any] = []
+        self._index: Optional[GeneIndex] = None
+
+    @property
+    def index(self) -> GeneIndex:
+        # Built on first use by the find/fix methods, which write through it
+        if self._index is None or self._index.chromosome is not self.chromosome:
+            self._index = GeneIndex(self.chromosome)
+        return self._index
 
     def check_frequencies(self) -> bool:
         return np.count_nonzero(self.chromosome) == self.config.total_duration
@@ -29,6 +38,7 @@ class ConstraintChecker:
     def subject_session_per_day_find(self) -> List[int]:
         self.faulty = []
         arr = self.chromosome
+        index = self.index
 
         for i in self.row_indices:
             for j in self.col_indices:
@@ -36,11 +46,7 @@ class ConstraintChecker:
                 if val == 0:
                     continue
 
-                twin_val = get_twin(arr, val)
-                if twin_val is None:
-                    continue
-
-                twin_location = locate_twin(arr, val)
+                twin_location = index.locate_twin(val)
                 if twin_location is None:
                     continue
 
@@ -51,12 +57,31 @@ class ConstraintChecker:
                 if i // SLOTS_PER_DAY == row_twin // SLOTS_PER_DAY:
                     self.faulty.append((i, j))
             
+    def subject_session_per_day_mask(self) -> np.ndarray:
+        # Same verdict as subject_session_per_day_find, computed in one pass:
+        # a gene is faulty when the first occurrence of its twin is on the same day
+        arr = self.chromosome
+        R = arr.shape[1]
+        rows = np.asarray(self.row_indices)
+        cols = np.asarray(self.col_indices)
+
+        values, first_index = np.unique(arr.ravel(), return_index=True)
+        sub = arr[np.ix_(rows, cols)]
+        twins = get_twin_values(sub)
+
+        pos = np.clip(np.searchsorted(values, twins), 0, len(values) - 1)
+        has_twin = (sub != 0) & (values[pos] == twins)
+        twin_day = (first_index[pos] // R) // SLOTS_PER_DAY
+        day = (rows // SLOTS_PER_DAY)[:, None]
+
+        return has_twin & (twin_day == day)
+
     def subject_session_per_day_check(self) -> bool:
-        self.subject_session_per_day_find()
-        if self.faulty:
+        mask = self.subject_session_per_day_mask()
+        if mask.any():
             if self.verbose:
-                i, j = self.faulty[0]
-                val = self.chromosome[i, j]
+                i, j = np.argwhere(mask)[0]
+                val = self.chromosome[self.row_indices[i], self.col_indices[j]]
                 print(f"Multiple sessions of subject in a day of val: {val}")
             return False
         
@@ -65,24 +90,21 @@ class ConstraintChecker:
     def subject_session_per_day_fix(self):
         self.subject_session_per_day_find()
         arr = self.chromosome
+        index = self.index
 
         for row, col in self.faulty:
-            val = arr[row, col]
-            twin_location = locate_twin(arr, val)
-            if twin_location is None:
+            val = int(arr[row, col])
+            if index.locate_twin(val) is None:
                 raise Exception("No twin found")
 
-            row_twin, col_twin = twin_location
-            
             placed = False
             for i in self.row_indices:
-                if i // SLOTS_PER_DAY == row_twin // SLOTS_PER_DAY:
+                if index.occupancy.twin_on_day(val, i // SLOTS_PER_DAY):
                     continue
 
                 for j in self.col_indices:
                     if arr[i, j] == 0:
-                        arr[i, j] = val
-                        arr[row, col] = 0
+                        index.move((row, col), (i, j))
                         placed = True
                         break
 
@@ -97,6 +119,7 @@ class ConstraintChecker:
     def time_constraint_find(self):
         self.faulty = []
         arr = self.chromosome
+        index = self.index
 
         for i in self.row_indices:
             for j in self.col_indices:
@@ -104,22 +127,38 @@ class ConstraintChecker:
                 if val == 0:
                     continue
 
-                _arr = arr.copy() // 100
-                if is_schedule_violated(_arr[i].flatten(), val // 100):
+                if index.occupancy.row_conflicts(i, val // 100):
                     self.faulty.append({
                         "val": int(val),
                         "location": (i, j)
                     })
-                    arr[i, j] = 0
+                    index.set(i, j, 0)
 
         self.chromosome = arr
 
+    def time_constraint_rows(self) -> np.ndarray:
+        # A row is violated when it holds more than one distinct subject;
+        # only rows with a non-zero gene inside the checked columns count
+        arr = self.chromosome
+        rows = np.asarray(self.row_indices)
+        cols = np.asarray(self.col_indices)
+
+        subjects, _, _ = decode_chromosome(arr[rows])
+        occupied = arr[rows] != 0
+        lowest = np.where(occupied, subjects, np.iinfo(subjects.dtype).max).min(axis=1)
+        highest = np.where(occupied, subjects, -1).max(axis=1)
+        checked = occupied[:, cols].any(axis=1)
+
+        return checked & (lowest != highest)
+
     def time_constraint_check(self) -> bool:
-        self.time_constraint_find()
-        if self.faulty:
+        violated = self.time_constraint_rows()
+        if violated.any():
             if self.verbose:
-                i, j = self.faulty[0]["location"]
-                val = self.faulty[0]["val"]
+                k = int(np.argmax(violated))
+                i = self.row_indices[k]
+                j = next(j for j in self.col_indices if self.chromosome[i, j] != 0)
+                val = self.chromosome[i, j]
                 print(f"Time constraint violation of val: {val} in row: {i}")
             return False
         
@@ -128,26 +167,23 @@ class ConstraintChecker:
     def time_constraint_fix(self):
         self.time_constraint_find()
         arr = self.chromosome
+        index = self.index
 
         for el in self.faulty:
             val = el["val"]
-            row, col = el["location"]
-            twin_location = locate_twin(arr, val)
+            occupancy = index.occupancy
 
             placed = False
             for i in self.row_indices:
-                if twin_location is not None:
-                    row_twin, col_twin = twin_location
-                    if i // SLOTS_PER_DAY == row_twin // SLOTS_PER_DAY:
-                        continue
+                if occupancy.twin_on_day(val, i // SLOTS_PER_DAY):
+                    continue
                 
-                _arr = arr.copy() // 100
-                if is_schedule_violated(_arr[i].flatten(), val // 100):
+                if occupancy.row_conflicts(i, val // 100):
                     continue
 
                 for j in self.col_indices:
                     if arr[i, j] == 0:
-                        arr[i, j] = val
+                        index.set(i, j, val)
                         placed = True
                         break
 
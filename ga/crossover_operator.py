@@ -4,12 +4,15 @@ from utils import io
 from globals import *
 from globals import Configuration
 from ga.constraint_checker import ConstraintChecker
-from utils.helper import get_twin, locate_twin, is_schedule_violated
+from ga.gene_index import GeneIndex
 from collections import Counter
+from utils.profiler import PhaseProfiler
 
 class CrossoverOperator:
-    def __init__(self, config: Configuration):
+    def __init__(self, config: Configuration, profiler: PhaseProfiler = None):
         self.config = config
+        self.profiler = PhaseProfiler() if profiler is None else profiler
+        self.failures = 0
 
     def run(self, parent1: np.ndarray, parent2: np.ndarray) -> np.ndarray:
         try:
@@ -21,6 +24,8 @@ class CrossoverOperator:
                 raise Exception("Invalid crossover method")
         except:
             print("Crossover failed, parent1 returned")
+            self.failures += 1
+            self.profiler.count("crossover_fallbacks")
             return parent1
 
         return child
@@ -75,6 +80,7 @@ class CrossoverOperator:
             raise Exception("Crossover failed")
         
         # Step 8: Faulty check
+        index = GeneIndex(child)
         faulty = []
         for i in range(rows):
             for j in range(midpoint, cols):
@@ -82,11 +88,7 @@ class CrossoverOperator:
                 if val == 0:
                     continue
 
-                twin_val = get_twin(child, val)
-                if twin_val is None:
-                    continue
-
-                twin_location = locate_twin(child, val)
+                twin_location = index.locate_twin(val)
                 if twin_location is None:
                     continue
 
@@ -100,7 +102,7 @@ class CrossoverOperator:
         # Step 9: Fix faulty
         for row, col in faulty:
             val = child[row, col]
-            twin_location = locate_twin(child, val)
+            twin_location = index.locate_twin(val)
             if twin_location is None:
                 raise Exception("No twin found")
 
@@ -113,8 +115,7 @@ class CrossoverOperator:
 
                 for j in range(midpoint, cols):
                     if child[i, j] == 0:
-                        child[i, j] = val
-                        child[row, col] = 0
+                        index.move((row, col), (i, j))
                         placed = True
                         break
 
@@ -184,8 +185,9 @@ class CrossoverOperator:
         )
 
         # Fix fault
-        checker.subject_session_per_day_fix()
-        checker.time_constraint_fix()
+        with self.profiler.phase("repair"):
+            checker.subject_session_per_day_fix()
+            checker.time_constraint_fix()
         child = checker.chromosome
 
         return child
@@ -0,0 +1,118 @@
+import math
+import numpy as np
+from typing import Dict, List, Tuple
+from globals import SLOTS_PER_DAY, Configuration
+from ga.parallel_class import ParallelClass
+
+# ((row, col) before, (row, col) after, gene value)
+Move = Tuple[Tuple[int, int], Tuple[int, int], int]
+
+class EvaluationState:
+    """Per-configuration adjacency sums of a feasible chromosome.
+
+    Keeps, for every parallel class configuration, the room used in each
+    time slot plus the sum and count of its adjacent-pair distances, so a
+    gene move only recomputes the pairs touching its old and new slot in
+    the configurations that include that gene. Sums are kept in the integer
+    distance units of the configuration, so they are exact and the
+    objectives equal a full evaluation bit for bit.
+    """
+
+    def __init__(self, chromosome: np.ndarray, config: Configuration):
+        parallel_class = ParallelClass(chromosome, config)
+        parallel_class.check_subjects()
+
+        self.distance_units = config.distance_units
+        self.distance_step = config.distance_step
+        self.size_vector = config.size_vector
+        self.combinations = ParallelClass.combinations(config.parallel_counts)
+        self.rows = chromosome.shape[0]
+
+        values = chromosome[parallel_class.gene_rows, parallel_class.gene_cols].tolist()
+        self.gene_info: Dict[int, Tuple[int, int]] = dict(zip(
+            values, zip(parallel_class.gene_subjects.tolist(), parallel_class.gene_parallels.tolist())
+        ))
+        self.positions: Dict[int, Tuple[int, int]] = dict(zip(
+            values, zip(parallel_class.gene_rows.tolist(), parallel_class.gene_cols.tolist())
+        ))
+
+        self.rooms = np.stack(list(parallel_class.iter_room_sequences()))
+        all_pairs = [t for t in range(self.rows - 1) if (t + 1) % SLOTS_PER_DAY != 0]
+        self.pair_sums, self.pair_counts = self._pair_stats(self.rooms, all_pairs)
+
+        # Genes of the first parallel of every subject, which the size objective measures
+        first = parallel_class.gene_parallels == 0
+        self.first_values: List[int] = [val for val, ok in zip(values, first.tolist()) if ok]
+
+    def copy(self) -> "EvaluationState":
+        clone = object.__new__(EvaluationState)
+        clone.__dict__.update(self.__dict__)
+        clone.positions = dict(self.positions)
+        clone.rooms = self.rooms.copy()
+        clone.pair_sums = self.pair_sums.copy()
+        clone.pair_counts = self.pair_counts.copy()
+        return clone
+
+    def _pair_stats(self, rooms: np.ndarray, pairs: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        a = rooms[:, pairs]
+        b = rooms[:, [t + 1 for t in pairs]]
+        adjacent = (a != -1) & (b != -1)
+        units = np.where(adjacent, self.distance_units[a, b], 0)
+        return units.sum(axis=1), adjacent.sum(axis=1)
+
+    def _touched_pairs(self, rows: List[int]) -> List[int]:
+        # First rows of the same-day adjacent pairs that include any of rows
+        touched = {t for r in rows for t in (r - 1, r)}
+        return sorted(t for t in touched if 0 <= t < self.rows - 1 and (t + 1) % SLOTS_PER_DAY != 0)
+
+    def apply_moves(self, chromosome: np.ndarray, moves: List[Move]) -> bool:
+        """Update the sums for moved genes; return whether chromosome stays feasible."""
+        for (r0, c0), (r1, c1), val in moves:
+            subject, parallel = self.gene_info[val]
+            configs = np.flatnonzero(self.combinations[:, subject] == parallel)
+            pairs = self._touched_pairs([r0, r1])
+
+            rooms = self.rooms[configs]
+            before_sums, before_counts = self._pair_stats(rooms, pairs)
+            rooms[:, r0] = -1
+            rooms[:, r1] = c1
+            after_sums, after_counts = self._pair_stats(rooms, pairs)
+
+            self.rooms[configs] = rooms
+            self.pair_sums[configs] += after_sums - before_sums
+            self.pair_counts[configs] += after_counts - before_counts
+
+            self.positions[val] = (r1, c1)
+
+        return self._moves_feasible(chromosome, moves)
+
+    def _moves_feasible(self, chromosome: np.ndarray, moves: List[Move]) -> bool:
+        # Frequencies are unchanged by moves; only the destination rows and
+        # the moved genes' twins can break a constraint
+        for val in {val for _, _, val in moves}:
+            row, _ = self.positions[val]
+
+            subjects = chromosome[row][chromosome[row] != 0] // 100
+            if np.any(subjects != subjects[0]):
+                return False
+
+            twin_val = val + 1 if val % 10 == 1 else val - 1
+            twin_location = self.positions.get(twin_val)
+            if twin_location is not None and twin_location[0] // SLOTS_PER_DAY == row // SLOTS_PER_DAY:
+                return False
+
+        return True
+
+    @property
+    def average_distance(self) -> float:
+        per_config = np.divide(
+            self.pair_sums.astype(float), self.pair_counts,
+            out=np.zeros(len(self.pair_sums)), where=self.pair_counts > 0
+        ) * self.distance_step
+        # Summed in configuration order, like the other evaluation paths
+        return sum(per_config.tolist()) / len(per_config)
+
+    @property
+    def average_size(self) -> float:
+        cols = [self.positions[val][1] for val in self.first_values]
+        return math.fsum(self.size_vector[cols].tolist()) / len(cols)
@@ -0,0 +1,71 @@
+import numpy as np
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+from globals import Configuration, FITNESS_CACHE_SIZE
+
+Entry = Tuple[bool, np.ndarray]
+
+class FitnessCache:
+    """Bounded LRU map of chromosome -> (feasible, objectives).
+
+    Keys come from key(); entries are shared between genomes, so callers
+    must not modify the returned objective arrays.
+    """
+
+    def __init__(self, capacity: int = FITNESS_CACHE_SIZE):
+        self.capacity = capacity
+        self.entries: "OrderedDict[Hashable, Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(config: Configuration, content_hash: int) -> Hashable:
+        # Objectives depend on the rooms' data and the curriculum, not only on
+        # the genes: configurations with equal genes but other data never share
+        return content_hash, config.fingerprint
+
+    def get(self, key: Hashable) -> Optional[Entry]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, feasible: bool, objectives: np.ndarray):
+        if self.capacity <= 0:
+            return
+        self.entries[key] = (bool(feasible), np.array(objectives, dtype=float))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, capacity: int):
+        self.capacity = capacity
+        while len(self.entries) > max(capacity, 0):
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def reset_counters(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def clear(self):
+        self.entries.clear()
+        self.reset_counters()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+# Process-wide memo shared by every Genome
+fitness_cache = FitnessCache()
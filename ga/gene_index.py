@@ -0,0 +1,78 @@
+import numpy as np
+from bisect import insort
+from typing import Dict, List, Optional, Tuple
+from globals import GENE_INDEX_DEBUG
+from ga.occupancy import Occupancy
+
+class GeneIndex:
+    """Gene value -> positions map kept in sync with a chromosome.
+
+    Positions are stored as row-major flat indices in ascending order, so
+    locate() returns the same cell as np.argwhere(arr == val)[0]. The row
+    and day occupancy bitmasks are maintained alongside. All writes must go
+    through set()/move() to keep the index valid.
+    """
+
+    def __init__(self, chromosome: np.ndarray, debug: bool = GENE_INDEX_DEBUG):
+        self.chromosome = chromosome
+        self.cols = chromosome.shape[1]
+        self.debug = debug
+
+        self.positions: Dict[int, List[int]] = {}
+        rows, cols = np.nonzero(chromosome)
+        flat = (rows * self.cols + cols).tolist()
+        for idx, val in zip(flat, chromosome[rows, cols].tolist()):
+            self.positions.setdefault(val, []).append(idx)
+        self.occupancy = Occupancy(chromosome)
+
+    def __contains__(self, val: int) -> bool:
+        return int(val) in self.positions
+
+    def locate(self, val: int) -> Optional[Tuple[int, int]]:
+        found = self.positions.get(int(val))
+        if not found:
+            return None
+        return divmod(found[0], self.cols)
+
+    def get_twin(self, val: int) -> Optional[int]:
+        val = int(val)
+        twin_val = val + 1 if val % 10 == 1 else val - 1
+        return twin_val if twin_val in self.positions else None
+
+    def locate_twin(self, val: int) -> Optional[Tuple[int, int]]:
+        twin_val = self.get_twin(val)
+        return self.locate(twin_val) if twin_val else None
+
+    def set(self, row: int, col: int, val: int):
+        old = int(self.chromosome[row, col])
+        val = int(val)
+        if old == val:
+            return
+
+        idx = row * self.cols + col
+        if old != 0:
+            found = self.positions[old]
+            found.remove(idx)
+            if not found:
+                del self.positions[old]
+            self.occupancy.remove(row, old)
+        if val != 0:
+            insort(self.positions.setdefault(val, []), idx)
+            self.occupancy.add(row, val)
+
+        self.chromosome[row, col] = val
+        if self.debug:
+            self.check()
+
+    def move(self, src: Tuple[int, int], dst: Tuple[int, int]):
+        val = self.chromosome[src]
+        self.set(*src, 0)
+        self.set(*dst, val)
+
+    def check(self):
+        # Debug: compare the index against the dense array
+        expected = GeneIndex(self.chromosome, debug=False)
+        if expected.positions != self.positions:
+            raise AssertionError("Gene index out of sync with chromosome")
+        if expected.occupancy.row_counts != self.occupancy.row_counts or expected.occupancy.day_counts != self.occupancy.day_counts:
+            raise AssertionError("Occupancy out of sync with chromosome")
@@ -1,6 +1,6 @@
 import numpy as np
 from typing import List
-from utils.helper import is_schedule_violated
+from ga.gene_index import GeneIndex
 from globals import SLOTS_PER_DAY, Configuration
 from dataframes.curriculum import Curriculum
 
@@ -19,18 +19,21 @@ def generate_valid_guess(
         raise ValueError("Not enough slots for all courses")
 
     arr = np.full((T, R), fill_value=0, dtype=np.int16)
+    index = GeneIndex(arr)
 
     classes_dict = curriculum.df[['id', 'classes', 'credits']].set_index('id').to_dict(orient='index')
     days_count = T // SLOTS_PER_DAY
     days_indices = list(range(days_count))
     time_slots = list(range(SLOTS_PER_DAY))
+    # Column j holds room room_indices[j]
+    columns = list(range(R))
 
     for id_, info in classes_dict.items():
         classes = info['classes']
         credits = info['credits']
         np.random.shuffle(days_indices)
         np.random.shuffle(time_slots)
-        np.random.shuffle(room_indices)
+        np.random.shuffle(columns)
         
         session_fill = 1
         for d in days_indices:
@@ -38,17 +41,15 @@ def generate_valid_guess(
             class_fill = 1
             for t in time_slots:
                 row = d * SLOTS_PER_DAY + t
-                subjects = arr // 100
 
-                if is_schedule_violated(subjects[row].flatten(), id_):
+                if index.occupancy.row_conflicts(row, id_):
                     continue
 
-                for r in room_indices:
-                    col = r
+                for col in columns:
                     if arr[row, col] != 0:
                         continue
 
-                    arr[row, col] = 100*id_ + 10*class_fill + session_fill
+                    index.set(row, col, 100*id_ + 10*class_fill + session_fill)
                     if class_fill == classes:
                         placed = True
                         break
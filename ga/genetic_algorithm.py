@@ -1,16 +1,19 @@
 import os
 import random
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 from utils import io
+from utils.exporter import AsyncExporter
+from utils.profiler import PhaseProfiler
 from globals import *
 from globals import Configuration
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from ga.genome import Genome
+from ga.batch_evaluator import BatchEvaluator
 from ga.crossover_operator import CrossoverOperator
 from ga.parent_selection import ParentSelection
-from dataclasses import dataclass
+from ga.population_initializer import PopulationInitializer
+from dataclasses import dataclass, asdict
 from dataframes.curriculum import Curriculum
 
 @dataclass
@@ -35,12 +38,16 @@ class GeneticAlgorithm:
             crossover_rate: float = CROSSOVER_RATE,
             mutation_rate: float = MUTATION_RATE,
             mutation_points: int = MUTATION_POINTS,
-            seed: List[np.ndarray] = None
-
+            seed: List[np.ndarray] = None,
+            population_folder: str = "population",
+            profile_path: Optional[str] = None,
+            checkpoint_path: Optional[str] = None,
+            checkpoint_interval: int = CHECKPOINT_INTERVAL,
+            resume: bool = False
         ):
 
         self.context = context
-        self.config = context.config
+        self.config = context.config.select_rooms(context.room_indices)
         assert population_size % 2 == 0, "Population size must be even"
         self.population_size = population_size
         self.max_generation = max_generation
@@ -48,15 +55,27 @@ class GeneticAlgorithm:
         self.mutation_rate = mutation_rate
         self.mutation_points = mutation_points
         self.seed = seed
+        self.population_folder = population_folder
         self.population: List[Genome] = []
         self.generation: int = 0
+        self.init_report: dict = {}
 
         # self.room_count_fitness: dict[str, FitnessStats] = {}
         self.average_distance_fitness: dict[str, FitnessStats] = {}
         self.average_size_fitness: dict[str, FitnessStats] = {}
         self.best_genome: Genome
-
-        self.initialize_population()
+        self.evaluator = BatchEvaluator(self.config)
+        self.exporter = AsyncExporter(max_queue=EXPORT_QUEUE_SIZE)
+        if profile_path is None and PROFILE_PHASES:
+            profile_path = PROFILE_PATH
+        self.profiler = PhaseProfiler(profile_path)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+
+        # A resumed run takes its population from load_checkpoint(); building
+        # and exporting a fresh one first would only leave a stray gen_0
+        if not resume:
+            self.initialize_population()
 
     def initialize_population(self):
         if self.seed is not None:
@@ -67,25 +86,149 @@ class GeneticAlgorithm:
             assert all([ch.shape == (T, R) for ch in self.seed]), f"Seed shape must be {(T,R)}"
             self.population = [Genome(ch, self.config) for ch in self.seed]
         else:
-            self.population = [
-                Genome.from_generator(
-                    self.context.curriculum,
-                    self.context.time_slot_indices,
-                    self.context.room_indices,
-                    self.config,
-                )
-                for _ in range(self.population_size)
-            ]
+            initializer = PopulationInitializer(
+                self.context.curriculum,
+                self.context.time_slot_indices,
+                self.context.room_indices,
+                workers=INIT_WORKERS,
+            )
+            chromosomes = initializer.generate(self.population_size)
+            self.population = [Genome(ch, self.config) for ch in chromosomes]
+
+            self.init_report = initializer.report()
+            print(
+                f"Initial population: {self.init_report['genomes']} genomes, "
+                f"attempts mean {self.init_report['mean_attempts']:.2f} max {self.init_report['max_attempts']}, "
+                f"local retries mean {self.init_report['mean_retries']:.2f} max {self.init_report['max_retries']}"
+            )
         self.export_population()
 
     def export_population(self, population: Optional[List[Genome]] = None, folder: str = None):
         population = self.population if population is None else population
-        folder = f"population/gen_{self.generation}" if folder is None else folder
-        width = len(str(self.max_generation))
+        folder = f"{self.population_folder}/gen_{self.generation}" if folder is None else folder
+
+        with self.profiler.phase("export"):
+            self.submit_export(population, folder)
+
+    def submit_export(self, population: List[Genome], folder: str):
+        # Snapshot now; the files are written on the exporter thread
+        chromosomes = np.stack([genome.chromosome for genome in population])
+
+        if EXPORT_FORMAT == "txt":
+            width = len(str(self.max_generation))
+
+            def job():
+                for i, chromosome in enumerate(chromosomes):
+                    filename = f"p_{i+1:0{width}d}.txt"
+                    io.export_to_txt(chromosome, folder, filename)
+        elif EXPORT_FORMAT == "npz":
+            path = os.path.join(folder, io.ARCHIVE_NAME)
+            objectives = self.evaluate_population(population)
+            ranks = np.array([-1 if genome.rank is None else genome.rank for genome in population])
+            metadata = self.archive_metadata()
+
+            def job():
+                io.save_population_archive(path, chromosomes, objectives=objectives, ranks=ranks, metadata=metadata)
+        else:
+            raise ValueError(f"Unsupported export format: {EXPORT_FORMAT}")
+
+        self.exporter.submit(job)
+
+    def archive_metadata(self) -> dict:
+        return {
+            "generation": self.generation,
+            "population_size": self.population_size,
+            "max_generation": self.max_generation,
+            "crossover_rate": float(self.crossover_rate),
+            "mutation_rate": float(self.mutation_rate),
+            "mutation_points": self.mutation_points,
+            "room_ids": list(self.config.room_ids),
+        }
+
+    def checkpoint_state(self) -> Tuple[dict, dict]:
+        # Everything run() needs to continue exactly as if never interrupted
+        objectives = self.evaluate_population()
+        py_version, py_keys, py_gauss = random.getstate()
+        _, np_keys, np_pos, np_has_gauss, np_gauss = np.random.get_state()
+
+        arrays = {
+            "chromosomes": np.stack([genome.chromosome for genome in self.population]),
+            "objectives": objectives,
+            "feasible": np.array([bool(genome.cached_check_constraint) for genome in self.population]),
+            "python_random": np.array(py_keys, dtype=np.uint32),
+            "numpy_random": np_keys,
+        }
+        state = {
+            **self.archive_metadata(),
+            "python_random": {"version": py_version, "gauss_next": py_gauss},
+            "numpy_random": {"pos": np_pos, "has_gauss": np_has_gauss, "cached_gaussian": np_gauss},
+            "average_distance_fitness": {gen: asdict(s) for gen, s in self.average_distance_fitness.items()},
+            "average_size_fitness": {gen: asdict(s) for gen, s in self.average_size_fitness.items()},
+        }
+        return arrays, state
+
+    def save_checkpoint(self, path: Optional[str] = None):
+        path = self.checkpoint_path if path is None else path
+        with self.profiler.phase("checkpoint"):
+            arrays, state = self.checkpoint_state()
+            io.save_checkpoint(path, arrays, state)
+
+    def load_checkpoint(self, path: Optional[str] = None) -> dict:
+        path = self.checkpoint_path if path is None else path
+        arrays, state = io.load_checkpoint(path)
+
+        # Continuing with other settings would not reproduce any single run
+        current = self.archive_metadata()
+        changed = [
+            key for key in ("room_ids", "population_size", "max_generation", "crossover_rate", "mutation_rate", "mutation_points")
+            if state[key] != current[key]
+        ]
+        if changed:
+            details = ", ".join(f"{key} {state[key]} != {current[key]}" for key in changed)
+            raise ValueError(f"Checkpoint {path} was written with other settings: {details}")
+
+        self.population = []
+        for chromosome, ok, obj in zip(arrays["chromosomes"], arrays["feasible"], arrays["objectives"]):
+            genome = Genome(chromosome.copy(), self.config)
+            genome.set_evaluation(ok, obj)
+            self.population.append(genome)
+        self.generation = state["generation"]
+
+        # JSON turns the generation keys into strings
+        self.average_distance_fitness = {int(gen): FitnessStats(**s) for gen, s in state["average_distance_fitness"].items()}
+        self.average_size_fitness = {int(gen): FitnessStats(**s) for gen, s in state["average_size_fitness"].items()}
+
+        py = state["python_random"]
+        random.setstate((py["version"], tuple(arrays["python_random"].tolist()), py["gauss_next"]))
+        npr = state["numpy_random"]
+        np.random.set_state(("MT19937", arrays["numpy_random"], npr["pos"], npr["has_gauss"], npr["cached_gaussian"]))
+
+        print(f"Resumed from {path} at generation {self.generation}")
+        return state
+
+    def resume(self, path: Optional[str] = None):
+        self.load_checkpoint(path)
+        self.run()
+
+    def checkpoint_if_due(self):
+        # Called once a generation is complete and exported
+        if self.checkpoint_path is not None and self.checkpoint_interval > 0 and self.generation % self.checkpoint_interval == 0:
+            self.save_checkpoint()
+
+    def evaluate_population(self, population: Optional[List[Genome]] = None) -> np.ndarray:
+        population = self.population if population is None else population
+
+        pending = [genome for genome in population if not genome.is_evaluated() and not genome.recall_evaluation()]
+        if pending:
+            chromosomes = np.stack([genome.chromosome for genome in pending]).astype(np.int16, copy=False)
+            objectives, feasible = self.evaluator.evaluate(chromosomes)
+            for genome, ok, obj in zip(pending, feasible, objectives):
+                genome.set_evaluation(ok, obj)
 
-        for i, genome in enumerate(population):
-            filename = f"p_{i+1:0{width}d}.txt"
-            io.export_to_txt(genome.chromosome, folder, filename)
+        return np.array(
+            [[genome.cached_average_distance, genome.cached_average_size] for genome in population],
+            dtype=float,
+        ).reshape(len(population), 2)
 
     def eval(self) -> None:
         # used_rooms = [
@@ -99,29 +242,34 @@ class GeneticAlgorithm:
         #     average=sum(used_rooms) / self.population_size
         # )
 
-        average_distances = [
-            genome.calculate_average_distance()
-            for genome in self.population
-        ]
+        objectives = self.evaluate_population()
+        average_distances = objectives[:, 0]
+        average_sizes = objectives[:, 1]
 
         self.average_distance_fitness[self.generation] = FitnessStats(
-            best=min(average_distances),
-            worst=max(average_distances),
-            average=sum(average_distances) / self.population_size
+            best=float(average_distances.min()),
+            worst=float(average_distances.max()),
+            average=float(average_distances.sum() / self.population_size)
         )
 
-        average_sizes = [
-            genome.calculate_average_size()
-            for genome in self.population
-        ]
-
         self.average_size_fitness[self.generation] = FitnessStats(
-            best=max(average_sizes),
-            worst=min(average_sizes),
-            average=sum(average_sizes) / self.population_size
-        )        
+            best=float(average_sizes.max()),
+            worst=float(average_sizes.min()),
+            average=float(average_sizes.sum() / self.population_size)
+        )
+
+    def plot_info(self) -> dict:
+        return {
+            "Population size": self.population_size,
+            "Crossover rate": self.crossover_rate,
+            "Mutation rate": self.mutation_rate,
+            "Mutation points": self.mutation_points,
+        }
 
     def plot_evaluation(self, type, folder: str = None, filename:str = None):
+        # matplotlib is only imported when plotting in-process
+        from utils import plotting
+
         if type == "room_count":
             eval = self.room_count_fitness
         elif type == "average_distance":
@@ -131,64 +279,19 @@ class GeneticAlgorithm:
         else:
             raise ValueError("Invalid evaluation type")
 
-        x = list(eval.keys())
-        best = [eval[i].best for i in x]
-        worst = [eval[i].worst for i in x]
-        average = [eval[i].average for i in x]
-
-        plt.figure(figsize=(10, 6))
-        plt.plot(x, best, label='Best Fitness')
-        plt.plot(x, worst, label='Worst Fitness')
-        plt.plot(x, average, label='Average Fitness')
-
-        type_to_ylabel = {
-            "room_count": "Room Count",
-            "average_distance": "Average Distance (m)",
-            "average_size": "Average Room Size (m^2)"
-        }
-
-        type_to_title = {
-            "room_count": "Room Count",
-            "average_distance": "Average Distance",
-            "average_size": "Average Room Size"
-        }
-
-        metric = type_to_title.get(EVALUATION_METHOD.value, "Unknown Metric")
-        ylabel = type_to_ylabel.get(type, "Unknown Type")
-        title = type_to_title.get(type, "Unknown Type")
-
-        info_text = (
-            f"Population size: {self.population_size}\n"
-            f"Crossover rate: {self.crossover_rate}\n"
-            f"Mutation rate: {self.mutation_rate}\n"
-            f"Mutation points: {self.mutation_points}"
-        )
-
+        info = self.plot_info()
         if not IS_MULTI_OBJECTIVE:
-            info_text = f"Metric: {metric}\n" + info_text
-            
-        plt.text(0.01, 0.02, info_text, transform=plt.gca().transAxes,
-                fontsize=10, verticalalignment='bottom', horizontalalignment='left',
-                bbox=dict(facecolor='white', edgecolor='gray', boxstyle='round,pad=0.3'))
-
-        plt.xlabel("Generation")
-        plt.ylabel(ylabel)
-        plt.title(f"{title} Fitness Evaluation Over Generations")
-        plt.legend()
-        plt.grid(True)
-        plt.tight_layout()
+            info = {"Metric": plotting.TYPE_TO_TITLE.get(EVALUATION_METHOD.value, "Unknown Metric"), **info}
 
         # Save to file with timestamp
         folder = "fig/evaluation" if folder is None else folder
-        os.makedirs(folder, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{type}_{timestamp}" if filename is None else filename
-        plt.savefig(f"{folder}/{filename}.png")
-
-        # plt.show()
-        plt.close()
+        plotting.plot_fitness_history({gen: asdict(s) for gen, s in eval.items()}, type, info, f"{folder}/{filename}.png")
 
     def plot_objective_space(self):
+        import matplotlib.pyplot as plt
+
         f1_vals = [genome.count_used_rooms() for genome in self.population]
         f2_vals = [genome.calculate_average_distance() for genome in self.population]
 
@@ -232,35 +335,44 @@ class GeneticAlgorithm:
         return ParentSelection(method=SELECTION_METHOD).run(self.population)
 
     def crossover(self, parent1: np.ndarray, parent2: np.ndarray) -> np.ndarray:
-        return CrossoverOperator(self.config).run(parent1, parent2)
+        return CrossoverOperator(self.config, self.profiler).run(parent1, parent2)
+
+    def count_infeasible(self, population: List[Genome]):
+        if self.profiler.enabled:
+            self.profiler.count("infeasible_offspring", sum(genome.cached_check_constraint is False for genome in population))
 
     def evolve(self):
         next_population = []
 
         # Selection
-        parents = self.select()
+        with self.profiler.phase("selection"):
+            parents = self.select()
 
         # Crossover
-        for i in range(0, len(parents), 2):
-            p1 = parents[i]
-            p2 = parents[i + 1]
-
-            identical = np.array_equal(p1.chromosome, p2.chromosome)
-            if random.random() < self.crossover_rate and not identical:
-                child1 = self.crossover(p1.chromosome, p2.chromosome)
-                child2 = self.crossover(p2.chromosome, p1.chromosome)
-                next_population.append(Genome(child1, self.config))
-                next_population.append(Genome(child2, self.config))
-            else:
-                next_population.extend([Genome(p1.chromosome, self.config), Genome(p2.chromosome, self.config)])
+        with self.profiler.phase("crossover"):
+            for i in range(0, len(parents), 2):
+                p1 = parents[i]
+                p2 = parents[i + 1]
+
+                identical = np.array_equal(p1.chromosome, p2.chromosome)
+                if random.random() < self.crossover_rate and not identical:
+                    child1 = self.crossover(p1.chromosome, p2.chromosome)
+                    child2 = self.crossover(p2.chromosome, p1.chromosome)
+                    next_population.append(Genome(child1, self.config))
+                    next_population.append(Genome(child2, self.config))
+                else:
+                    next_population.extend([p1.copy(), p2.copy()])
 
         # Mutation
-        for genome in next_population:
-            if random.random() < self.mutation_rate:
-                genome.mutate()
+        with self.profiler.phase("mutation"):
+            for genome in next_population:
+                if random.random() < self.mutation_rate:
+                    genome.mutate(self.mutation_points)
 
         self.population = next_population
-        self.eval()
+        with self.profiler.phase("evaluation"):
+            self.eval()
+        self.count_infeasible(self.population)
         
         if EVALUATION_METHOD.value == "room_count":
             self.best_genome = min(self.population, key=Genome.count_used_rooms)
@@ -272,7 +384,15 @@ class GeneticAlgorithm:
         self.generation += 1
 
     def run(self):
-        for _ in range(self.max_generation):
-            self.evolve()
-            if self.generation > 0.95 * self.max_generation:
-                self.export_population()
\ No newline at end of file
+        try:
+            while self.generation < self.max_generation:
+                self.profiler.start_generation()
+                self.evolve()
+                if self.generation > 0.95 * self.max_generation:
+                    self.export_population()
+                self.checkpoint_if_due()
+                self.profiler.end_generation(self.generation - 1)
+        finally:
+            self.exporter.close()
+            self.profiler.close()
+        self.profiler.print_summary()
\ No newline at end of file
@@ -1,14 +1,24 @@
+import math
 import numpy as np
-from globals import Configuration
-from utils.helper import get_adjacent_classes, haversine
+from globals import Configuration, MUTATION_POINTS, DELTA_EVALUATION
+from utils.helper import get_adjacent_rooms, chromosome_hash
 from ga import generator
 from ga.constraint_checker import ConstraintChecker
+from ga.delta_evaluation import EvaluationState
+from ga.fitness_cache import FitnessCache, fitness_cache
+from ga.batch_evaluator import INFEASIBLE_DISTANCE, INFEASIBLE_SIZE
 from ga.mutation_operator import MutationOperator
 from ga.parallel_class import ParallelClass
 from dataframes.curriculum import Curriculum
 from typing import List, Optional, Union
 
 class Genome:
+    __slots__ = (
+        "_chromosome", "_content_hash", "config",
+        "cached_check_constraint", "cached_config", "cached_used_rooms",
+        "cached_average_distance", "cached_average_size", "evaluation_state",
+        "rank", "crowding_distance",
+    )
 
     def __init__(self, chromosome: np.ndarray, config: Configuration):
         self.chromosome = chromosome
@@ -19,10 +29,9 @@ class Genome:
         self.cached_used_rooms: Optional[int] = None
         self.cached_average_distance: Optional[float] = None
         self.cached_average_size: Optional[float] = None
+        self.evaluation_state: Optional[EvaluationState] = None
         
         self.rank: Optional[int] = None
-        self.dominated_set: List[Genome] = []
-        self.domination_count: int = 0
         self.crowding_distance: float = 0.0
 
     @classmethod
@@ -35,11 +44,46 @@ class Genome:
     ):
         guess = generator.generate_valid_guess(curriculum, time_slot_indices, room_indices, config)
         return cls(guess, config)
+
+    @property
+    def chromosome(self) -> np.ndarray:
+        return self._chromosome
+
+    @chromosome.setter
+    def chromosome(self, chromosome: np.ndarray):
+        self._chromosome = chromosome
+        self._content_hash = None
+
+    @property
+    def content_hash(self) -> int:
+        # Computed on first use; in-place edits of the array must reassign
+        # chromosome to invalidate it
+        if self._content_hash is None:
+            self._content_hash = chromosome_hash(self._chromosome)
+        return self._content_hash
+
+    def __hash__(self) -> int:
+        return self.content_hash
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Genome):
+            return NotImplemented
+        return self.content_hash == other.content_hash and np.array_equal(self._chromosome, other._chromosome)
+
+    def copy(self) -> "Genome":
+        genome = Genome(self.chromosome.copy(), self.config)
+        genome._content_hash = self._content_hash
+        genome.cached_check_constraint = self.cached_check_constraint
+        genome.cached_config = self.cached_config
+        genome.cached_used_rooms = self.cached_used_rooms
+        genome.cached_average_distance = self.cached_average_distance
+        genome.cached_average_size = self.cached_average_size
+        if self.evaluation_state is not None:
+            genome.evaluation_state = self.evaluation_state.copy()
+        return genome
     
     def reset_state(self):
         self.rank = None
-        self.dominated_set = []
-        self.domination_count = 0
         self.crowding_distance = 0.0
 
     def clear_cache(self):
@@ -48,6 +92,42 @@ class Genome:
         self.cached_used_rooms = None
         self.cached_average_distance = None
         self.cached_average_size = None
+        self.evaluation_state = None
+
+    def is_evaluated(self) -> bool:
+        return self.cached_average_distance is not None and self.cached_average_size is not None
+
+    def set_evaluation(self, feasible: bool, objectives: np.ndarray):
+        self.cached_check_constraint = bool(feasible)
+        self.cached_average_distance = float(objectives[0])
+        self.cached_average_size = float(objectives[1])
+        self.remember_evaluation()
+
+    def recall_evaluation(self) -> bool:
+        # Fill the caches from the process-wide fitness memo; True on a hit
+        entry = fitness_cache.get(FitnessCache.key(self.config, self.content_hash))
+        if entry is None:
+            return False
+        feasible, objectives = entry
+        self.cached_check_constraint = feasible
+        self.cached_average_distance = float(objectives[0])
+        self.cached_average_size = float(objectives[1])
+        return True
+
+    def remember_evaluation(self):
+        if self.cached_check_constraint is False:
+            objectives = (INFEASIBLE_DISTANCE, INFEASIBLE_SIZE)
+        elif self.cached_check_constraint and self.is_evaluated():
+            objectives = (self.cached_average_distance, self.cached_average_size)
+        else:
+            return
+        fitness_cache.put(FitnessCache.key(self.config, self.content_hash), self.cached_check_constraint, objectives)
+
+    def ensure_checked(self) -> bool:
+        if self.cached_check_constraint is None and not self.recall_evaluation():
+            self.cached_check_constraint = self.check_constraint(verbose=True)
+            self.remember_evaluation()
+        return self.cached_check_constraint
 
     def get_objectives(self) -> List[Union[int, float]]:
         return np.array([self.calculate_average_distance(), self.calculate_average_size()])
@@ -67,57 +147,74 @@ class Genome:
         if self.cached_average_distance is not None:
             return self.cached_average_distance
         
-        if self.cached_check_constraint is None:
-            self.cached_check_constraint = self.check_constraint(verbose=True)
-        
-        if not self.cached_check_constraint:
+        if not self.ensure_checked():
             return 1000.0
+        if self.cached_average_distance is not None:
+            return self.cached_average_distance
                 
-        config = self.get_config()
+        # Exact integer sums, divided once: the same value as BatchEvaluator
+        # and EvaluationState
+        distance_units = self.config.distance_units
         results = []
-        for c in config:
-            adjacents = get_adjacent_classes(c)
-            distances = []
-            for adj in adjacents:
-                room1, room2 = adj
-                point1 = self.config.coordinates[room1 + 1]
-                point2 = self.config.coordinates[room2 + 1]
-                distance = haversine(point1, point2)
-                distances.append(distance)
-            
-            avg = sum(distances) / len(distances) if distances else 0.0
+        for rooms in ParallelClass(self.chromosome, self.config).iter_room_sequences():
+            a, b = get_adjacent_rooms(rooms)
+            avg = float(distance_units[a, b].sum()) / len(a) * self.config.distance_step if len(a) else 0.0
             results.append(avg)
 
         result_value = sum(results) / len(results) if results else 0.0
         self.cached_average_distance = result_value
+        self.remember_evaluation()
         return result_value
     
     def calculate_average_size(self) -> float:
         if self.cached_average_size is not None:
             return self.cached_average_size
         
-        if self.cached_check_constraint is None:
-            self.cached_check_constraint = self.check_constraint(verbose=True)
-        
-        if not self.cached_check_constraint:
+        if not self.ensure_checked():
             return 0
+        if self.cached_average_size is not None:
+            return self.cached_average_size
         
-        config = self.get_config()
-        for c in config:
-            rooms = np.nonzero(c)[1].tolist()
-            if not rooms:
-                raise ValueError("No rooms found in the configuration")
+        rooms = ParallelClass(self.chromosome, self.config).get_first_config_rooms()
+        if len(rooms) == 0:
+            raise ValueError("No rooms found in the configuration")
 
-            sizes = [self.config.sizes[room + 1] for room in rooms]
-            return sum(sizes) / len(sizes)
+        result_value = math.fsum(self.config.size_vector[rooms].tolist()) / len(rooms)
+        self.cached_average_size = result_value
+        self.remember_evaluation()
+        return result_value
 
     def check_constraint(self, verbose):
         return ConstraintChecker(self.chromosome, self.config, verbose=verbose).validate()
     
-    def mutate(self):
-        self.chromosome = MutationOperator(self.chromosome).mutate()
+    def get_evaluation_state(self) -> Optional[EvaluationState]:
+        # Only built for genomes already known to be feasible
+        if self.evaluation_state is None and self.cached_check_constraint:
+            self.evaluation_state = EvaluationState(self.chromosome, self.config)
+        return self.evaluation_state
+
+    def mutate(self, mutation_points: int = MUTATION_POINTS):
+        # Copy first: offspring may share the chromosome array with a parent
+        operator = MutationOperator(self.chromosome.copy(), mutation_points)
+        state = self.get_evaluation_state() if DELTA_EVALUATION else None
+        self.chromosome = operator.mutate()
         self.reset_state()
+
+        if state is not None and not operator.moves:
+            return
+
         self.clear_cache()
+        if state is None:
+            return
+
+        if state.apply_moves(self.chromosome, operator.moves):
+            self.cached_check_constraint = True
+            self.cached_average_distance = state.average_distance
+            self.cached_average_size = state.average_size
+            self.evaluation_state = state
+        else:
+            self.cached_check_constraint = False
+        self.remember_evaluation()
     
     def get_config(self) -> List[np.ndarray]:
         if self.cached_config is None:
@@ -1,11 +1,13 @@
 import numpy as np
-from utils.helper import get_twin, locate_value, is_schedule_violated
+from ga.gene_index import GeneIndex
 from globals import SLOTS_PER_DAY, MUTATION_METHOD, MUTATION_POINTS
 
 class MutationOperator:
     def __init__(self, chromosome: np.ndarray, mutation_points: int = MUTATION_POINTS):
         self.chromosome = chromosome
         self.mutation_points = mutation_points
+        # ((row, col) before, (row, col) after, gene value) of every placed gene
+        self.moves = []
 
     def mutate(self) -> np.ndarray:
         if MUTATION_METHOD == "random_swap":
@@ -15,6 +17,8 @@ class MutationOperator:
         
     def random_swap(self) -> np.ndarray:
         arr = self.chromosome
+        index = GeneIndex(arr)
+        occupancy = index.occupancy
         T, R = arr.shape
         time_indices = list(range(T))
         room_indices = list(range(R))
@@ -22,33 +26,26 @@ class MutationOperator:
         for _ in range(self.mutation_points):
             row = np.random.choice(T)
             col = np.random.choice(R)
-            val = arr[row, col]
+            val = int(arr[row, col])
 
             np.random.shuffle(time_indices)
             np.random.shuffle(room_indices)
 
             placed = False
             for i in time_indices:
-                twin_val = get_twin(arr, val)
-                if twin_val is not None:
-                    twin_location = locate_value(arr, twin_val)
-                    if twin_location is None:
-                        raise Exception("No twin found")
-                    row_twin, col_twin = twin_location
-                    
-                    if i // SLOTS_PER_DAY == row_twin // SLOTS_PER_DAY:
-                        continue
+                if occupancy.twin_on_day(val, i // SLOTS_PER_DAY):
+                    continue
 
-                _arr = arr.copy() // 100
-                if is_schedule_violated(_arr[i].flatten(), val // 100):
+                if occupancy.row_conflicts(i, val // 100):
                     continue
                         
                 for j in room_indices:
                     if arr[i, j] != 0:
                         continue
 
-                    arr[i, j] = val
-                    arr[row, col] = 0
+                    index.move((row, col), (i, j))
+                    if val != 0:
+                        self.moves.append(((int(row), int(col)), (i, j), int(val)))
                     placed = True
                     break
 
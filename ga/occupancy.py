@@ -0,0 +1,71 @@
+import numpy as np
+from typing import Dict, List
+from globals import SLOTS_PER_DAY
+
+class Occupancy:
+    """Per-row subject bitmasks and per-day session bitmasks of a chromosome.
+
+    Bit positions are assigned to subjects and gene values on first sight.
+    Counts back the masks so a bit is only cleared when the last gene of
+    its subject (row) or value (day) leaves. Kept in sync by
+    GeneIndex.set(); never write the chromosome behind its back.
+    """
+
+    def __init__(self, chromosome: np.ndarray):
+        T = chromosome.shape[0]
+        days = -(-T // SLOTS_PER_DAY)
+
+        self.subject_bits: Dict[int, int] = {}
+        self.value_bits: Dict[int, int] = {}
+        self.row_masks: List[int] = [0] * T
+        self.row_counts: List[Dict[int, int]] = [{} for _ in range(T)]
+        self.day_masks: List[int] = [0] * days
+        self.day_counts: List[Dict[int, int]] = [{} for _ in range(days)]
+
+        rows, cols = np.nonzero(chromosome)
+        for row, val in zip(rows.tolist(), chromosome[rows, cols].tolist()):
+            self.add(row, val)
+
+    @staticmethod
+    def _bit(bits: Dict[int, int], key: int) -> int:
+        bit = bits.get(key)
+        if bit is None:
+            bit = bits[key] = 1 << len(bits)
+        return bit
+
+    def add(self, row: int, val: int):
+        subject = val // 100
+        counts = self.row_counts[row]
+        if counts.get(subject, 0) == 0:
+            self.row_masks[row] |= self._bit(self.subject_bits, subject)
+        counts[subject] = counts.get(subject, 0) + 1
+
+        day = row // SLOTS_PER_DAY
+        counts = self.day_counts[day]
+        if counts.get(val, 0) == 0:
+            self.day_masks[day] |= self._bit(self.value_bits, val)
+        counts[val] = counts.get(val, 0) + 1
+
+    def remove(self, row: int, val: int):
+        subject = val // 100
+        counts = self.row_counts[row]
+        counts[subject] -= 1
+        if counts[subject] == 0:
+            del counts[subject]
+            self.row_masks[row] &= ~self.subject_bits[subject]
+
+        day = row // SLOTS_PER_DAY
+        counts = self.day_counts[day]
+        counts[val] -= 1
+        if counts[val] == 0:
+            del counts[val]
+            self.day_masks[day] &= ~self.value_bits[val]
+
+    def row_conflicts(self, row: int, subject: int) -> bool:
+        # Same as is_schedule_violated(arr[row] // 100, subject)
+        return self.row_masks[row] & ~self.subject_bits.get(subject, 0) != 0
+
+    def twin_on_day(self, val: int, day: int) -> bool:
+        # Whether the other session of val's parallel class sits on day
+        twin_val = val + 1 if val % 10 == 1 else val - 1
+        return self.day_masks[day] & self.value_bits.get(twin_val, 0) != 0
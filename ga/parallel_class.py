@@ -1,15 +1,31 @@
 import numpy as np
 from math import lcm
+from itertools import product
 from collections import defaultdict
-from typing import List, Tuple, Dict
-from globals import Configuration
+from typing import Iterator, List, Tuple, Dict
+from globals import Configuration, PARALLEL_COMBINATIONS
 
 class ParallelClass:
     def __init__(self, chromosome: np.ndarray, config: Configuration):
         self.chromosome = chromosome
         self.parallel_counts = config.parallel_counts
         self.rows, self.cols = chromosome.shape
-        self.class_dict = self._extract_parallel_classes()
+
+        # One entry per gene, in row-major order
+        self.gene_rows, self.gene_cols = np.nonzero(chromosome)
+        values = chromosome[self.gene_rows, self.gene_cols].astype(np.int64)
+        self.subjects = sorted(set((values // 100).tolist()))
+        self.gene_subjects = np.searchsorted(self.subjects, values // 100)
+        self.gene_parallels = self._rank_parallels(values)
+
+    def _rank_parallels(self, values: np.ndarray) -> np.ndarray:
+        # Position of each gene's parallel among the sorted parallels of its subject
+        keys = values // 10
+        unique_keys = np.unique(keys)
+        key_subjects = unique_keys // 10
+        first_of_subject = np.searchsorted(key_subjects, key_subjects, side="left")
+        key_ranks = np.arange(len(unique_keys)) - first_of_subject
+        return key_ranks[np.searchsorted(unique_keys, keys)]
 
     def _extract_parallel_classes(self) -> Dict[int, Dict[int, List[Tuple[int, int, int]]]]:
         class_dict = defaultdict(lambda: defaultdict(list))
@@ -23,8 +39,49 @@ class ParallelClass:
                 class_dict[subject][parallel].append((i, j, val))
         return class_dict
 
+    @staticmethod
+    def combinations(parallel_counts: Tuple[int, ...], mode: str = PARALLEL_COMBINATIONS) -> np.ndarray:
+        # (K, S) matrix of the parallel index each configuration takes per subject
+        if mode == "lcm":
+            total_lcm = 1
+            for count in parallel_counts:
+                total_lcm = lcm(total_lcm, count)
+            k = np.arange(total_lcm)[:, None]
+            return k % np.asarray(parallel_counts)[None, :]
+        elif mode == "product":
+            return np.array(list(product(*(range(count) for count in parallel_counts))))
+        else:
+            raise ValueError(f"Unsupported parallel combination mode: {mode}")
+
+    def check_subjects(self):
+        if len(self.subjects) != len(self.parallel_counts):
+            print("Subjects:", self.subjects)
+            print("Parallel counts:", self.parallel_counts)
+            raise ValueError("Mismatch between number of subjects and parallel_counts")
+
+    def iter_room_sequences(self, mode: str = PARALLEL_COMBINATIONS) -> Iterator[np.ndarray]:
+        # Room used in every time slot by each configuration, -1 if empty
+        self.check_subjects()
+
+        for combination in self.combinations(self.parallel_counts, mode):
+            selected = self.gene_parallels == combination[self.gene_subjects]
+            rows = self.gene_rows[selected]
+            if len(rows) != len(np.unique(rows)):
+                bad_rows = np.unique(rows[np.diff(rows, prepend=-1) == 0])
+                raise ValueError(f"Row(s) with more than one non-zero value: {bad_rows}")
+
+            rooms = np.full(self.rows, -1, dtype=np.intp)
+            rooms[rows] = self.gene_cols[selected]
+            yield rooms
+
+    def get_first_config_rooms(self) -> np.ndarray:
+        # Rooms of the configuration taking the first parallel of every subject
+        self.check_subjects()
+        return self.gene_cols[self.gene_parallels == 0]
+
     def get_all_schedule_matrices(self) -> List[np.ndarray]:
-        subjects = sorted(self.class_dict.keys())
+        class_dict = self._extract_parallel_classes()
+        subjects = sorted(class_dict.keys())
 
         if len(subjects) != len(self.parallel_counts):
             print("Subjects:", subjects)
@@ -34,7 +91,7 @@ class ParallelClass:
         # Get sorted parallel session lists for each subject
         parallel_lists = []
         for subject in subjects:
-            subject_parallels = self.class_dict[subject]
+            subject_parallels = class_dict[subject]
             parallel_lists.append([
                 subject_parallels[pid] for pid in sorted(subject_parallels)
             ])
@@ -0,0 +1,161 @@
+import numpy as np
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from globals import SLOTS_PER_DAY, INIT_MAX_ATTEMPTS, INIT_LOCAL_RETRIES
+from dataframes.curriculum import Curriculum
+
+@dataclass
+class InitTask:
+    subjects: List[Tuple[int, int, int]]  # (id, classes, credits)
+    shape: Tuple[int, int]
+    seed: Tuple[int, ...]
+    max_attempts: int
+    local_retries: int
+
+@dataclass
+class InitResult:
+    chromosome: np.ndarray
+    attempts: int  # whole-chromosome attempts, 1 when the first one succeeded
+    retries: int  # local re-placements of a single subject, over all attempts
+
+class _Placement:
+    """Occupancy of a chromosome under construction.
+
+    row_subject holds the subject owning each time slot (0 if empty) and
+    free counts its empty rooms; subject_days is a bitset of the days a
+    subject already has a session on.
+    """
+
+    def __init__(self, T: int, R: int):
+        self.arr = np.zeros((T, R), dtype=np.int16)
+        self.row_subject = np.zeros(T, dtype=np.int64)
+        self.free = np.full(T, R, dtype=np.int64)
+        self.subject_days = {}
+
+    def place_session(self, subject: int, classes: int, session: int, day: int, slots: np.ndarray, columns: np.ndarray) -> bool:
+        # All parallels of a session go on the given day, first free rooms first
+        placed = []
+        parallel = 1
+        for t in slots:
+            row = day * SLOTS_PER_DAY + t
+            if self.row_subject[row] not in (0, subject) or self.free[row] == 0:
+                continue
+            for col in columns:
+                if self.arr[row, col] != 0:
+                    continue
+                self.arr[row, col] = 100 * subject + 10 * parallel + session
+                self.row_subject[row] = subject
+                self.free[row] -= 1
+                placed.append((row, col))
+                if parallel == classes:
+                    self.subject_days[subject] = self.subject_days.get(subject, 0) | (1 << day)
+                    return True
+                parallel += 1
+
+        self.undo(placed)
+        return False
+
+    def undo(self, placed: List[Tuple[int, int]]):
+        for row, col in placed:
+            self.arr[row, col] = 0
+            self.free[row] += 1
+            if self.free[row] == self.arr.shape[1]:
+                self.row_subject[row] = 0
+
+    def clear_subject(self, subject: int):
+        rows, cols = np.nonzero(self.arr // 100 == subject)
+        self.undo(list(zip(rows.tolist(), cols.tolist())))
+        self.subject_days.pop(subject, None)
+
+def _place_subject(placement: _Placement, subject: int, classes: int, credits: int, days: int, rng: np.random.Generator) -> bool:
+    columns = rng.permutation(placement.arr.shape[1])
+    session = 1
+    for day in rng.permutation(days).tolist():
+        if placement.subject_days.get(subject, 0) >> day & 1:
+            continue
+        # Days that cannot host the session are skipped instead of failing
+        if placement.place_session(subject, classes, session, day, rng.permutation(SLOTS_PER_DAY), columns):
+            if session == credits:
+                return True
+            session += 1
+    return False
+
+def build_chromosome(task: InitTask) -> InitResult:
+    rng = np.random.default_rng(np.random.SeedSequence(task.seed))
+    T, R = task.shape
+    days = T // SLOTS_PER_DAY
+    retries = 0
+
+    for attempt in range(1, task.max_attempts + 1):
+        placement = _Placement(T, R)
+        complete = True
+        for subject, classes, credits in task.subjects:
+            for _ in range(task.local_retries + 1):
+                if _place_subject(placement, subject, classes, credits, days, rng):
+                    break
+                placement.clear_subject(subject)
+                retries += 1
+            else:
+                complete = False
+                break
+
+        if complete:
+            return InitResult(placement.arr, attempt, retries)
+
+    raise ValueError(f"No feasible chromosome after {task.max_attempts} attempts; the instance is likely infeasible")
+
+class PopulationInitializer:
+    def __init__(
+            self,
+            curriculum: Curriculum,
+            time_slot_indices: List[int],
+            room_indices: List[int],
+            workers: int = 0,
+            max_attempts: int = INIT_MAX_ATTEMPTS,
+            local_retries: int = INIT_LOCAL_RETRIES
+        ):
+        info = curriculum.df[['id', 'classes', 'credits']]
+        self.subjects = [(int(i), int(c), int(k)) for i, c, k in info.itertuples(index=False)]
+        self.shape = (len(time_slot_indices), len(room_indices))
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.local_retries = local_retries
+        self.results: List[InitResult] = []
+
+        for subject, classes, credits in self.subjects:
+            if classes > self.shape[1] * SLOTS_PER_DAY or credits > self.shape[0] // SLOTS_PER_DAY:
+                raise ValueError(f"Not enough slots for course {subject}")
+
+    def generate(self, count: int, seed: Optional[int] = None) -> List[np.ndarray]:
+        # Every genome has its own stream, so the result does not depend on workers
+        if seed is None:
+            seed = int(np.random.randint(0, 2**31 - 1))
+        tasks = [
+            InitTask(self.subjects, self.shape, (seed, i), self.max_attempts, self.local_retries)
+            for i in range(count)
+        ]
+
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                chunksize = max(1, count // (4 * self.workers))
+                self.results = list(executor.map(build_chromosome, tasks, chunksize=chunksize))
+        else:
+            self.results = [build_chromosome(task) for task in tasks]
+
+        return [result.chromosome for result in self.results]
+
+    def report(self) -> dict:
+        attempts = np.array([result.attempts for result in self.results])
+        retries = np.array([result.retries for result in self.results])
+        if len(attempts) == 0:
+            return {"genomes": 0}
+        return {
+            "genomes": len(attempts),
+            "attempts": attempts.tolist(),
+            "retries": retries.tolist(),
+            "mean_attempts": float(attempts.mean()),
+            "max_attempts": int(attempts.max()),
+            "mean_retries": float(retries.mean()),
+            "max_retries": int(retries.max()),
+        }
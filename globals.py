@@ -1,5 +1,6 @@
-from dataclasses import dataclass
-from typing import Final, Dict, Tuple
+import numpy as np
+from dataclasses import dataclass, field, replace
+from typing import Final, Dict, List, Tuple
 from pathlib import Path
 
 from enums.evaluation_method import EvaluationMethod
@@ -14,6 +15,34 @@ class Configuration:
     sizes: Dict[int, int]
     total_duration: int
     parallel_counts: Tuple[int, ...]
+    subject_ids: Tuple[int, ...]
+    room_ids: Tuple[int, ...]
+    distance_matrix: np.ndarray  # (R, R) float32, indexed by column position
+    size_vector: np.ndarray  # (R,), indexed by column position
+    distance_units: np.ndarray = field(init=False, repr=False)  # distance_matrix as integer multiples of distance_step
+    distance_step: float = field(init=False, repr=False)
+    fingerprint: int = field(init=False, repr=False)  # identifies the problem in fitness cache keys
+
+    def __post_init__(self):
+        from utils.helper import fixed_point, config_fingerprint
+
+        # Every evaluation path sums distance_units and divides the exact sum
+        # once, so objectives do not depend on summation order
+        self.distance_units, self.distance_step = fixed_point(self.distance_matrix)
+        self.fingerprint = config_fingerprint(
+            self.distance_matrix, self.size_vector, self.room_ids,
+            self.subject_ids, self.parallel_counts, self.total_duration,
+        )
+
+    def select_rooms(self, room_indices: List[int]) -> "Configuration":
+        # Restrict room lookups so that column j maps to room_indices[j]
+        idx = np.asarray(room_indices, dtype=np.intp)
+        return replace(
+            self,
+            room_ids=tuple(self.room_ids[i] for i in idx),
+            distance_matrix=self.distance_matrix[np.ix_(idx, idx)],
+            size_vector=self.size_vector[idx],
+        )
 
 
 def load_config(
@@ -22,6 +51,8 @@ def load_config(
     rooms_csv: str = "csv/rooms.csv",
 ) -> Configuration:
     """Load scheduling configuration from CSV files."""
+    from utils.helper import haversine_matrix
+
     base_path = Path(__file__).resolve().parent
 
     subjects_path = base_path / subjects_csv
@@ -42,12 +73,21 @@ def load_config(
         (curriculum.df["classes"] * curriculum.df["credits"]).sum()
     )
     parallel_counts = tuple(curriculum.df["classes"])
+    subject_ids = tuple(int(i) for i in curriculum.df["id"])
+
+    room_ids = tuple(int(i) for i in rooms.df["id"])
+    distance_matrix = haversine_matrix(rooms.df["lat"], rooms.df["long"]).astype(np.float32)
+    size_vector = rooms.df["size"].to_numpy(dtype=float)
 
     return Configuration(
         coordinates=coordinates,
         sizes=sizes,
         total_duration=total_duration,
         parallel_counts=parallel_counts,
+        subject_ids=subject_ids,
+        room_ids=room_ids,
+        distance_matrix=distance_matrix,
+        size_vector=size_vector,
     )
 
 
@@ -64,3 +104,21 @@ EVALUATION_METHOD = EvaluationMethod.AVERAGE_SIZE
 SELECTION_METHOD: Final[str] = "tournament"
 CROSSOVER_METHOD: Final[str] = "column_based"
 MUTATION_METHOD: Final[str] = "random_swap"
+EXPORT_FORMAT: Final[str] = "npz"  # "npz" (one archive per population) or "txt"
+EXPORT_QUEUE_SIZE: Final[int] = 8  # pending exports before the GA loop blocks
+GENE_INDEX_DEBUG: Final[bool] = False  # check GeneIndex against the dense array on every write
+PARALLEL_COMBINATIONS: Final[str] = "lcm"  # "lcm" or "product" (every unique combination)
+DELTA_EVALUATION: Final[bool] = True  # update objectives of evaluated genomes incrementally on mutation
+FITNESS_CACHE_SIZE: Final[int] = 100_000  # chromosomes remembered by the fitness memo, 0 disables it
+PROFILE_PHASES: Final[bool] = False  # per-generation phase timings, appended as JSON lines to PROFILE_PATH
+PROFILE_PATH: Final[str] = "profile.jsonl"
+INIT_MAX_ATTEMPTS: Final[int] = 100  # whole-chromosome restarts before the instance is reported infeasible
+INIT_LOCAL_RETRIES: Final[int] = 10  # re-placements of one subject before restarting the chromosome
+INIT_WORKERS: Final[int] = 0  # processes for the initial population, <= 1 builds it in-process
+HYPERVOLUME_REFERENCE: Final[Tuple[float, float]] = (1000.0, 0.0)  # (distance, size) of an infeasible genome
+STAGNATION_PATIENCE: Final[int] = 0  # stop NSGA2 after this many generations without hypervolume gain, 0 never stops
+STAGNATION_EPSILON: Final[float] = 1e-4  # relative hypervolume gain below which a window counts as stagnant
+CHECKPOINT_INTERVAL: Final[int] = 10  # generations between checkpoints, when a checkpoint path is given
+MIGRATION_INTERVAL: Final[int] = 10  # generations between migrations of the island model
+MIGRATION_SIZE: Final[int] = 4  # rank-0 genomes each island sends per migration
+MIGRATION_TOPOLOGY: Final[str] = "ring"  # "ring" (to the next island) or "full" (to every other island)
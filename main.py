@@ -1,51 +1,66 @@
 import random
+import argparse
 import numpy as np
-from utils import io
+from itertools import product
 from globals import *
-from globals import load_config
-from dataframes.subject import Subject
-from dataframes.curriculum import Curriculum
-from ga.genetic_algorithm import GeneticAlgorithm, ProblemContext
-from nsga.nsga import NSGA2
+from nsga.sweep import ParameterSweep
+from nsga.islands import IslandModel, TOPOLOGIES
 
 if __name__ == '__main__':
-    subjects = Subject("csv/subjects.csv")
-    curriculum = Curriculum("csv/curriculum.csv", subjects.df)
-    config = load_config()
+    parser = argparse.ArgumentParser(description="Run an NSGA-II parameter sweep over crossover and mutation rates")
+    parser.add_argument("--runs", type=int, default=100, help="number of sampled (crossover, mutation) configurations")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-memory-mb", type=int, default=None, help="memory hint per worker, caps the worker count")
+    parser.add_argument("--seed", type=int, default=None, help="master seed for parameter sampling and run RNG streams (a restarted sweep keeps its own)")
+    parser.add_argument("--seed-folder", type=str, default="seed", help="initial population folder ('' to generate)")
+    parser.add_argument("--population-size", type=int, default=100)
+    parser.add_argument("--max-generation", type=int, default=100)
+    parser.add_argument("--output", type=str, default="simulation")
+    parser.add_argument("--no-plots", action="store_true", help="skip figures; draw them later with python -m utils.plotting")
+    parser.add_argument("--islands", type=int, default=0, help="run one island-model NSGA-II with this many islands instead of the sweep")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default=MIGRATION_TOPOLOGY)
+    parser.add_argument("--migration-interval", type=int, default=MIGRATION_INTERVAL)
+    parser.add_argument("--migration-size", type=int, default=MIGRATION_SIZE)
+    args = parser.parse_args()
 
-    context = ProblemContext(
-        curriculum=curriculum,
-        time_slot_indices=list(range(15)),
-        room_indices=list(range(16)),
-        config=config,
-    )
-
-    crossover_rates = np.linspace(0.7, 0.9, 20)
-    mutation_rates = np.linspace(0.1, 0.3, 20)
-
-    all_combinations = list(product(crossover_rates, mutation_rates))
-    all_combinations = [(round(c, 2), round(m, 2)) for c, m in all_combinations]
-    params = random.sample(all_combinations, k=100)
-    seed = io.import_all_txt_arrays("seed")
-
-    for i, param in enumerate(params):
-        crossover_rate, mutation_rate = param
-        nsga = NSGA2(
-            context=context,
-            population_size=100,
-            max_generation=100,
-            crossover_rate=crossover_rate,
-            mutation_rate=mutation_rate,
+    if args.islands > 0:
+        model = IslandModel(
+            islands=args.islands,
+            root=args.output,
+            population_size=args.population_size,
+            max_generation=args.max_generation,
+            crossover_rate=CROSSOVER_RATE,
+            mutation_rate=MUTATION_RATE,
             mutation_points=MUTATION_POINTS,
-            seed=seed
+            migration_interval=args.migration_interval,
+            migration_size=args.migration_size,
+            topology=args.topology,
+            time_slot_count=15,
+            room_count=16,
+            seed_folder=args.seed_folder or None,
+            master_seed=args.seed,
         )
+        model.run()
+    else:
+        crossover_rates = np.linspace(0.7, 0.9, 20)
+        mutation_rates = np.linspace(0.1, 0.3, 20)
 
-        nsga.run()
-        nsga.plot_objective_space(connect_by_rank=True, folder=f"simulation/run_{i+1}/objective_space", filename="after")
-
-        nsga.plot_evaluation(type="average_distance", folder=f"simulation/run_{i+1}/evaluation", filename="average_distance")
-        nsga.plot_evaluation(type="average_size", folder=f"simulation/run_{i+1}/evaluation", filename="average_size")
-
-        pareto_front = nsga.fronts[0]
-        nsga.export_population(pareto_front, folder=f"simulation/run_{i+1}/pareto_front")
+        all_combinations = list(product(crossover_rates, mutation_rates))
+        all_combinations = [(round(c, 2), round(m, 2)) for c, m in all_combinations]
+        params = random.Random(args.seed).sample(all_combinations, k=args.runs)
 
+        sweep = ParameterSweep(
+            params=params,
+            root=args.output,
+            population_size=args.population_size,
+            max_generation=args.max_generation,
+            mutation_points=MUTATION_POINTS,
+            time_slot_count=15,
+            room_count=16,
+            seed_folder=args.seed_folder or None,
+            master_seed=args.seed,
+            workers=args.workers,
+            max_memory_per_worker=args.max_memory_mb,
+            plot=not args.no_plots,
+        )
+        sweep.run()
@@ -1,42 +1,40 @@
-from typing import List
+import numpy as np
+from typing import List, Optional
 from ga.genome import Genome
 
 class CrowdingDistance:
-    def __init__(self, front: List[Genome]):
+    def __init__(self, front: List[Genome], objectives: Optional[np.ndarray] = None):
         self.front = front
 
-    def assign(self):
-        n = len(self.front)
-        if n == 0:
-            return
-        elif n == 1:
-            self.front[0].crowding_distance = float('inf')
-            return
-        elif n == 2:
-            self.front[0].crowding_distance = float('inf')
-            self.front[1].crowding_distance = float('inf')
-            return
-
-        # Reset
-        for genome in self.front:
-            genome.crowding_distance = 0.0
-
-        objectives = [
-            Genome.calculate_average_distance,
-            Genome.calculate_average_size
-        ]
-
-        for obj_func in objectives:
-            self.front.sort(key=obj_func)
-
-            self.front[0].crowding_distance = float('inf')
-            self.front[-1].crowding_distance = float('inf')
-
-            f_min = obj_func(self.front[0])
-            f_max = obj_func(self.front[-1])
+        if objectives is None:
+            objectives = np.array([genome.get_objectives() for genome in front], dtype=float)
+        self.objectives = objectives.reshape(len(front), -1)
+
+    def assign(self) -> np.ndarray:
+        distances = self.compute(self.objectives)
+        for genome, distance in zip(self.front, distances.tolist()):
+            genome.crowding_distance = distance
+
+        return distances
+
+    @staticmethod
+    def compute(objectives: np.ndarray) -> np.ndarray:
+        # objectives: (n, M) sub-matrix of one front
+        n = len(objectives)
+        if n <= 2:
+            return np.full(n, np.inf)
+
+        distances = np.zeros(n)
+        for m in range(objectives.shape[1]):
+            values = objectives[:, m]
+            order = np.argsort(values, kind="stable")
+            sorted_values = values[order]
+
+            f_min = sorted_values[0]
+            f_max = sorted_values[-1]
             norm = f_max - f_min if f_max != f_min else 1e-9
 
-            for i in range(1, n - 1):
-                prev = obj_func(self.front[i - 1])
-                next_ = obj_func(self.front[i + 1])
-                self.front[i].crowding_distance += (next_ - prev) / norm
+            distances[order[[0, -1]]] = np.inf
+            distances[order[1:-1]] += (sorted_values[2:] - sorted_values[:-2]) / norm
+
+        return distances
@@ -0,0 +1,179 @@
+import os
+import json
+import numpy as np
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+from utils import io
+from utils.front_store import FrontStore
+from utils.helper import chromosome_hash, normalize_objectives
+from globals import HYPERVOLUME_REFERENCE, Configuration
+from ga.batch_evaluator import BatchEvaluator
+from nsga.hypervolume import Hypervolume
+from nsga.non_dominated_sorting import NonDominatedSorting
+
+TXT_CHUNK_SIZE = 256  # .txt or front store chromosomes read and evaluated per batch
+
+def iter_front_files(paths: List[str], chunk_size: int = TXT_CHUNK_SIZE) -> Iterator[Tuple[str, np.ndarray]]:
+    # (source, chromosomes) per archive, per chunk of each run in a front
+    # store, and per chunk of .txt files in a folder (all credited to the folder)
+    for path in paths:
+        if os.path.isfile(path):
+            yield path, io.load_population_archive(path).chromosomes
+            continue
+
+        store = FrontStore(path)
+        if store.exists():
+            for chromosomes, index in store.iter_shards():
+                run_ids = index["run_id"].to_numpy()
+                # Rows of one run are contiguous: each shard holds whole runs
+                bounds = np.flatnonzero(np.diff(run_ids)) + 1
+                for begin, end in zip(np.r_[0, bounds], np.r_[bounds, len(run_ids)]):
+                    source = os.path.join(path, f"run_{run_ids[begin]}")
+                    for start in range(begin, end, chunk_size):
+                        yield source, np.asarray(chromosomes[start:min(start + chunk_size, end)])
+            continue
+
+        names = sorted(os.listdir(path))
+        for name in names:
+            if name.endswith(".npz"):
+                yield os.path.join(path, name), io.load_population_archive(os.path.join(path, name)).chromosomes
+
+        txt_names = [name for name in names if name.endswith(".txt")]
+        for start in range(0, len(txt_names), chunk_size):
+            chunk = txt_names[start:start + chunk_size]
+            yield path, np.stack([io.import_from_txt(path, name) for name in chunk])
+
+class FrontMerger:
+    """Incrementally updated non-dominated archive over saved fronts.
+
+    Each batch is deduplicated by content hash against every chromosome read
+    so far, evaluated once, and merged with the archive by a two-objective
+    sort that keeps only rank 0. Memory is the archive (the global front),
+    one batch, and an 8-byte hash per distinct chromosome read.
+
+    Ranks of the full union are never known, since dominated chromosomes are
+    dropped. The rank statistics are those available per batch instead: how
+    many of a source's chromosomes formed their batch's first front, the ranks its chromosomes got against the
+    archive when merged (rank 0 entered the front), and how many of them
+    are still in the global front.
+    """
+
+    def __init__(self, config: Configuration, maximize_mask: Optional[np.ndarray] = None):
+        self.config = config
+        self.evaluator = BatchEvaluator(config)
+        self.maximize_mask = np.array([False, True]) if maximize_mask is None else maximize_mask
+
+        self.chromosomes: Optional[np.ndarray] = None
+        self.objectives = np.empty((0, 2))
+        self.hashes: List[int] = []
+        self.sources: List[str] = []
+        self.seen = set()
+
+        self.read = 0
+        self.duplicates = 0
+        self.infeasible = 0
+        self.evaluated = 0
+        self.merge_ranks: Counter = Counter()
+        self.source_stats: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add(self, chromosomes: np.ndarray, source: str) -> int:
+        """Merge a (N, T, R) batch; returns how many of it entered the front."""
+        chromosomes = np.asarray(chromosomes, dtype=np.int16)
+        if self.chromosomes is not None and chromosomes.shape[1:] != self.chromosomes.shape[1:]:
+            raise ValueError(f"{source}: chromosome shape {chromosomes.shape[1:]} does not match {self.chromosomes.shape[1:]}")
+        self.read += len(chromosomes)
+        stats = self.source_stats.setdefault(source, {"read": 0, "batch_front": 0, "entered": 0})
+        stats["read"] += len(chromosomes)
+
+        new, new_hashes = [], []
+        for i, chromosome in enumerate(chromosomes):
+            h = chromosome_hash(chromosome)
+            if h in self.seen:
+                self.duplicates += 1
+                continue
+            self.seen.add(h)
+            new.append(i)
+            new_hashes.append(h)
+        if not new:
+            return 0
+
+        batch = chromosomes[new]
+        objectives, feasible = self.evaluator.evaluate(batch)
+        self.evaluated += len(batch)
+        self.infeasible += int(np.count_nonzero(~feasible))
+        if not feasible.any():
+            return 0
+
+        batch = batch[feasible]
+        objectives = objectives[feasible]
+        new_hashes = [h for h, ok in zip(new_hashes, feasible.tolist()) if ok]
+
+        batch_ranks, _ = NonDominatedSorting.sort(normalize_objectives(objectives, self.maximize_mask))
+        stats["batch_front"] += int(np.count_nonzero(batch_ranks == 0))
+
+        n = len(self.hashes)
+        combined = np.concatenate([self.objectives, objectives])
+        ranks, _ = NonDominatedSorting.sort(normalize_objectives(combined, self.maximize_mask))
+        keep = np.flatnonzero(ranks == 0)
+        self.merge_ranks.update(ranks[n:].tolist())
+        stats["entered"] += int(np.count_nonzero(keep >= n))
+
+        chromosomes = batch if self.chromosomes is None else np.concatenate([self.chromosomes, batch])
+        hashes = self.hashes + new_hashes
+        sources = self.sources + [source] * len(batch)
+
+        self.chromosomes = chromosomes[keep]
+        self.objectives = combined[keep]
+        self.hashes = [hashes[i] for i in keep.tolist()]
+        self.sources = [sources[i] for i in keep.tolist()]
+        return int(np.count_nonzero(keep >= n))
+
+    def merge(self, paths: List[str], chunk_size: int = TXT_CHUNK_SIZE) -> "FrontMerger":
+        for source, chromosomes in iter_front_files(paths, chunk_size):
+            self.add(chromosomes, source)
+        return self
+
+    def hypervolume(self) -> float:
+        return Hypervolume.area(
+            normalize_objectives(self.objectives, self.maximize_mask),
+            normalize_objectives(np.asarray(HYPERVOLUME_REFERENCE, dtype=float), self.maximize_mask),
+        )
+
+    def report(self) -> dict:
+        contributions = Counter(self.sources)
+        return {
+            "read": self.read,
+            "duplicates": self.duplicates,
+            "evaluated": self.evaluated,
+            "infeasible": self.infeasible,
+            "dominated": self.evaluated - self.infeasible - len(self),
+            "front": len(self),
+            "hypervolume": self.hypervolume(),
+            # Rank of each feasible chromosome against the front it was merged into
+            "merge_ranks": {int(rank): count for rank, count in sorted(self.merge_ranks.items())},
+            "objective_range": {
+                "average_distance": [float(self.objectives[:, 0].min()), float(self.objectives[:, 0].max())] if len(self) else [],
+                "average_size": [float(self.objectives[:, 1].min()), float(self.objectives[:, 1].max())] if len(self) else [],
+            },
+            "sources": {
+                source: {**stats, "in_front": contributions.get(source, 0)}
+                for source, stats in self.source_stats.items()
+            },
+        }
+
+    def save(self, folder: str):
+        # Front sorted by the first objective, plus report.json next to it
+        order = np.argsort(self.objectives[:, 0], kind="stable")
+        chromosomes = self.chromosomes[order] if self.chromosomes is not None else np.empty((0, 0, 0), dtype=np.int16)
+        io.save_population_archive(
+            os.path.join(folder, io.ARCHIVE_NAME),
+            chromosomes,
+            objectives=self.objectives[order],
+            ranks=np.zeros(len(self), dtype=np.int64),
+            metadata={"sources": [self.sources[i] for i in order.tolist()], "room_ids": list(self.config.room_ids)},
+        )
+        with open(os.path.join(folder, "report.json"), "w") as f:
+            json.dump(self.report(), f, indent=2)
@@ -0,0 +1,45 @@
+import numpy as np
+from typing import List, Optional, Tuple
+from globals import HYPERVOLUME_REFERENCE
+from ga.genome import Genome
+from utils.helper import normalize_objectives
+
+class Hypervolume:
+    def __init__(
+            self,
+            front: List[Genome],
+            objectives: Optional[np.ndarray] = None,
+            reference: Tuple[float, float] = HYPERVOLUME_REFERENCE,
+            maximize_mask: Optional[np.ndarray] = None
+        ):
+        self.front = front
+
+        if objectives is None:
+            objectives = np.array([genome.get_objectives() for genome in front], dtype=float)
+        if maximize_mask is None:
+            maximize_mask = np.array([False, True])  # index 0: minimize, index 1: maximize
+
+        self.objectives = normalize_objectives(objectives.reshape(len(front), 2), maximize_mask)
+        self.reference = normalize_objectives(np.asarray(reference, dtype=float), maximize_mask)
+
+    def compute(self) -> float:
+        return self.area(self.objectives, self.reference)
+
+    @staticmethod
+    def area(objectives: np.ndarray, reference: np.ndarray) -> float:
+        # Exact area dominated by (n, 2) minimized points and bounded by reference
+        points = objectives[np.all(objectives < reference, axis=1)]
+        if len(points) == 0:
+            return 0.0
+
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        points = points[order]
+
+        # Sweep by the first objective, keeping points that lower the second
+        best = np.minimum.accumulate(points[:, 1])
+        keep = np.concatenate(([True], best[1:] < best[:-1]))
+        x = points[keep, 0]
+        y = best[keep]
+
+        widths = np.diff(np.append(x, reference[0]))
+        return float(np.sum(widths * (reference[1] - y)))
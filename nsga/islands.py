@@ -0,0 +1,326 @@
+import os
+import json
+import time
+import traceback
+import multiprocessing
+import numpy as np
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+from utils import io
+from utils.helper import chromosome_hash, normalize_objectives
+from globals import (
+    CROSSOVER_RATE, MUTATION_RATE, MUTATION_POINTS, HYPERVOLUME_REFERENCE,
+    MIGRATION_INTERVAL, MIGRATION_SIZE, MIGRATION_TOPOLOGY, Configuration,
+)
+from ga.genome import Genome
+from nsga.nsga import NSGA2
+from nsga.hypervolume import Hypervolume
+from nsga.non_dominated_sorting import NonDominatedSorting
+from nsga.sweep import load_problem, seed_rngs
+
+TOPOLOGIES = ("ring", "full")
+
+@dataclass
+class Migrants:
+    chromosomes: np.ndarray  # (N, T, R)
+    objectives: np.ndarray  # (N, 2)
+    feasible: np.ndarray  # (N,) bool
+
+    def __len__(self):
+        return len(self.chromosomes)
+
+    @staticmethod
+    def from_genomes(genomes: List[Genome]) -> "Migrants":
+        return Migrants(
+            chromosomes=np.stack([genome.chromosome for genome in genomes]),
+            objectives=np.array([genome.get_objectives() for genome in genomes], dtype=float).reshape(len(genomes), 2),
+            feasible=np.array([bool(genome.cached_check_constraint) for genome in genomes]),
+        )
+
+    @staticmethod
+    def concatenate(groups: List["Migrants"]) -> "Migrants":
+        return Migrants(
+            chromosomes=np.concatenate([group.chromosomes for group in groups]),
+            objectives=np.concatenate([group.objectives for group in groups]),
+            feasible=np.concatenate([group.feasible for group in groups]),
+        )
+
+    def to_genomes(self, config: Configuration) -> List[Genome]:
+        genomes = []
+        for chromosome, ok, obj in zip(self.chromosomes, self.feasible, self.objectives):
+            genome = Genome(chromosome.copy(), config)
+            genome.set_evaluation(ok, obj)
+            genomes.append(genome)
+        return genomes
+
+@dataclass
+class IslandTask:
+    island_id: int
+    island_count: int
+    seed: Tuple[int, ...]
+    folder: str
+    population_size: int
+    max_generation: int
+    crossover_rate: float
+    mutation_rate: float
+    mutation_points: int
+    migration_interval: int
+    migration_size: int
+    time_slot_count: int
+    room_count: int
+    seed_folder: Optional[str]
+
+def migration_targets(topology: str, active: List[int]) -> Dict[int, List[int]]:
+    # Receivers of each active island's migrants; stopped islands drop out of the ring
+    if topology == "ring":
+        return {island: [active[(i + 1) % len(active)]] for i, island in enumerate(active)} if len(active) > 1 else {}
+    if topology == "full":
+        return {island: [other for other in active if other != island] for island in active}
+    raise ValueError(f"Unknown migration topology: {topology}")
+
+def island_seed(seed: Optional[List[np.ndarray]], task: IslandTask) -> Optional[List[np.ndarray]]:
+    # Island i takes the i-th population_size slice of the seed population;
+    # a seed too small to give every island its own slice is not used, and
+    # each island generates its population from its own RNG stream instead
+    if seed is None or len(seed) < task.island_count * task.population_size:
+        return None
+    start = task.island_id * task.population_size
+    return seed[start:start + task.population_size]
+
+def run_island(task: IslandTask, conn):
+    # Island process: evolve migration_interval generations, send emigrants,
+    # wait for immigrants, repeat; finally send the first front and stats
+    try:
+        seed_rngs(task.seed)
+        context, seed = load_problem(task.time_slot_count, task.room_count, task.seed_folder)
+        seed = island_seed(seed, task)
+        nsga = NSGA2(
+            context=context,
+            population_size=task.population_size,
+            max_generation=task.max_generation,
+            crossover_rate=task.crossover_rate,
+            mutation_rate=task.mutation_rate,
+            mutation_points=task.mutation_points,
+            seed=seed,
+            population_folder=os.path.join(task.folder, "population"),
+        )
+
+        received = 0
+        try:
+            while not nsga.finished():
+                for _ in range(task.migration_interval):
+                    nsga.step()
+                    if nsga.finished():
+                        break
+                if nsga.finished():
+                    break
+
+                conn.send(("migrants", Migrants.from_genomes(nsga.emigrants(task.migration_size))))
+                immigrants: Optional[Migrants] = conn.recv()
+                if immigrants is not None and len(immigrants):
+                    nsga.immigrate(immigrants.to_genomes(nsga.config))
+                    received += len(immigrants)
+        finally:
+            nsga.shutdown()
+
+        stats = {
+            "island_id": task.island_id,
+            "seed": list(task.seed),
+            "generations": nsga.generation,
+            "stopped_generation": nsga.stopped_generation,
+            "immigrants": received,
+            "pareto_front": [genome.get_objectives().tolist() for genome in nsga.fronts[0]],
+            "average_distance_fitness": {gen: asdict(s) for gen, s in nsga.average_distance_fitness.items()},
+            "average_size_fitness": {gen: asdict(s) for gen, s in nsga.average_size_fitness.items()},
+            "hypervolume": nsga.hypervolume,
+        }
+        with open(os.path.join(task.folder, "stats.json"), "w") as f:
+            json.dump(stats, f, indent=2)
+
+        conn.send(("done", (Migrants.from_genomes(nsga.fronts[0]), stats)))
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+def merge_fronts(fronts: List[Migrants]) -> Migrants:
+    # Global first front of the union, duplicates (by content) kept once
+    merged = Migrants.concatenate(fronts)
+    _, first = np.unique([chromosome_hash(ch) for ch in merged.chromosomes], return_index=True)
+    first.sort()
+    merged = Migrants(merged.chromosomes[first], merged.objectives[first], merged.feasible[first])
+
+    ranks, _ = NonDominatedSorting.sort(normalize_objectives(merged.objectives, np.array([False, True])))
+    keep = ranks == 0
+    return Migrants(merged.chromosomes[keep], merged.objectives[keep], merged.feasible[keep])
+
+class IslandModel:
+    """NSGA2 populations in separate processes exchanging rank-0 migrants.
+
+    Every migration_interval generations each island sends its migration_size
+    most isolated first-front members to its neighbours (the next island in a
+    ring, or every other island when fully connected) and merges what it
+    receives through survivor selection. Islands advance in lockstep, so a
+    run is reproducible from master_seed. The merged global front is written
+    to root/pareto_front.
+    """
+
+    def __init__(
+            self,
+            islands: int,
+            root: str = "islands",
+            population_size: int = 100,
+            max_generation: int = 100,
+            crossover_rate: float = CROSSOVER_RATE,
+            mutation_rate: float = MUTATION_RATE,
+            mutation_points: int = MUTATION_POINTS,
+            migration_interval: int = MIGRATION_INTERVAL,
+            migration_size: int = MIGRATION_SIZE,
+            topology: str = MIGRATION_TOPOLOGY,
+            time_slot_count: int = 15,
+            room_count: int = 16,
+            seed_folder: Optional[str] = "seed",
+            master_seed: Optional[int] = None
+        ):
+        assert islands >= 1, "Need at least one island"
+        assert migration_interval >= 1, "Migration interval must be at least one generation"
+        assert migration_size >= 1, "Migration size must be at least one genome"
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown migration topology: {topology}")
+
+        self.islands = islands
+        self.root = root
+        self.population_size = population_size
+        self.max_generation = max_generation
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.mutation_points = mutation_points
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.topology = topology
+        self.time_slot_count = time_slot_count
+        self.room_count = room_count
+        self.seed_folder = seed_folder
+        self.master_seed = np.random.SeedSequence(master_seed).entropy
+
+        self.front: Optional[Migrants] = None
+        self.island_stats: List[dict] = []
+        self.migrations = 0
+
+    def build_tasks(self) -> List[IslandTask]:
+        return [
+            IslandTask(
+                island_id=i,
+                island_count=self.islands,
+                seed=(self.master_seed, i),
+                folder=os.path.join(self.root, f"island_{i}"),
+                population_size=self.population_size,
+                max_generation=self.max_generation,
+                crossover_rate=self.crossover_rate,
+                mutation_rate=self.mutation_rate,
+                mutation_points=self.mutation_points,
+                migration_interval=self.migration_interval,
+                migration_size=self.migration_size,
+                time_slot_count=self.time_slot_count,
+                room_count=self.room_count,
+                seed_folder=self.seed_folder,
+            )
+            for i in range(self.islands)
+        ]
+
+    def run(self) -> Migrants:
+        os.makedirs(self.root, exist_ok=True)
+        print(f"Islands: {self.islands} x {self.population_size} genomes, {self.topology} topology, "
+              f"{self.migration_size} migrants every {self.migration_interval} generations (master seed {self.master_seed})")
+        start = time.perf_counter()
+
+        connections = {}
+        processes = []
+        for task in self.build_tasks():
+            os.makedirs(task.folder, exist_ok=True)
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_island, args=(task, child))
+            process.start()
+            child.close()
+            connections[task.island_id] = parent
+            processes.append(process)
+
+        fronts: Dict[int, Migrants] = {}
+        stats: Dict[int, dict] = {}
+        try:
+            active = list(connections)
+            while active:
+                outgoing: Dict[int, Migrants] = {}
+                for island in active:
+                    kind, payload = connections[island].recv()
+                    if kind == "error":
+                        raise RuntimeError(f"Island {island} failed:\n{payload}")
+                    if kind == "done":
+                        fronts[island], stats[island] = payload
+                    else:
+                        outgoing[island] = payload
+
+                # Islands that asked for immigrants all reached the same generation
+                active = list(outgoing)
+                incoming: Dict[int, List[Migrants]] = {island: [] for island in active}
+                for sender, receivers in migration_targets(self.topology, active).items():
+                    for receiver in receivers:
+                        incoming[receiver].append(outgoing[sender])
+                for island in active:
+                    groups = incoming[island]
+                    connections[island].send(Migrants.concatenate(groups) if groups else None)
+                if active:
+                    self.migrations += 1
+        except BaseException:
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join()
+            for conn in connections.values():
+                conn.close()
+
+        self.island_stats = [stats[i] for i in sorted(stats)]
+        self.front = merge_fronts([fronts[i] for i in sorted(fronts)])
+        self.export(time.perf_counter() - start)
+
+        print(f"Islands done in {time.perf_counter() - start:.1f}s after {self.migrations} migrations, global pareto front: {len(self.front)}")
+        return self.front
+
+    def export(self, elapsed: float):
+        metadata = {
+            "islands": self.islands,
+            "topology": self.topology,
+            "migration_interval": self.migration_interval,
+            "migration_size": self.migration_size,
+            "population_size": self.population_size,
+            "max_generation": self.max_generation,
+            "crossover_rate": float(self.crossover_rate),
+            "mutation_rate": float(self.mutation_rate),
+            "mutation_points": self.mutation_points,
+        }
+        io.save_population_archive(
+            os.path.join(self.root, "pareto_front", io.ARCHIVE_NAME),
+            self.front.chromosomes,
+            objectives=self.front.objectives,
+            ranks=np.zeros(len(self.front), dtype=np.int64),
+            metadata=metadata,
+        )
+
+        maximize_mask = np.array([False, True])
+        hypervolume = Hypervolume.area(
+            normalize_objectives(self.front.objectives, maximize_mask),
+            normalize_objectives(np.asarray(HYPERVOLUME_REFERENCE, dtype=float), maximize_mask),
+        )
+        stats = {
+            **metadata,
+            "seed": self.master_seed,
+            "elapsed": elapsed,
+            "migrations": self.migrations,
+            "pareto_front": self.front.objectives.tolist(),
+            "hypervolume": hypervolume,
+            "island_fronts": {s["island_id"]: len(s["pareto_front"]) for s in self.island_stats},
+        }
+        with open(os.path.join(self.root, "stats.json"), "w") as f:
+            json.dump(stats, f, indent=2)
@@ -1,62 +1,90 @@
 import numpy as np
-from typing import List
+from bisect import bisect_left
+from typing import List, Optional, Tuple
 from ga.genome import Genome
 from utils.helper import normalize_objectives
 
 class NonDominatedSorting:
-    def __init__(self, population: List[Genome]):
+    def __init__(
+            self,
+            population: List[Genome],
+            objectives: Optional[np.ndarray] = None,
+            maximize_mask: Optional[np.ndarray] = None
+        ):
         self.population = population
         self.population_size = len(population)
 
-    def reset_genomes(self):
-        for genome in self.population:
+        if objectives is None:
+            objectives = np.array([genome.get_objectives() for genome in population], dtype=float)
+        if maximize_mask is None:
+            maximize_mask = np.array([False, True])  # index 0: minimize, index 1: maximize
+
+        self.objectives = normalize_objectives(objectives.reshape(self.population_size, -1), maximize_mask)
+        self.ranks: np.ndarray = np.empty(0, dtype=np.int64)
+        self.front_indices: List[np.ndarray] = []
+
+    def run(self) -> List[List[Genome]]:
+        self.ranks, self.front_indices = self.sort(self.objectives)
+
+        for genome, rank in zip(self.population, self.ranks.tolist()):
             genome.reset_state()
+            genome.rank = rank
+
+        return [[self.population[i] for i in front] for front in self.front_indices]
+
+    @staticmethod
+    def sort(objectives: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
+        # objectives: (N, M), every column minimized
+        if len(objectives) == 0:
+            return np.empty(0, dtype=np.int64), []
+
+        if objectives.shape[1] == 2:
+            ranks = NonDominatedSorting.two_objective_ranks(objectives)
+        else:
+            ranks = NonDominatedSorting.domination_matrix_ranks(objectives)
+
+        fronts = [np.flatnonzero(ranks == k) for k in range(int(ranks.max()) + 1)]
+        return ranks, fronts
+
+    @staticmethod
+    def two_objective_ranks(objectives: np.ndarray) -> np.ndarray:
+        # O(N log N): sweep by (f1, f2) and binary search the first front that
+        # does not dominate the point. Each front is represented by its last
+        # member's (f2, f1), which is dominated-or-equal ordered across fronts.
+        f1 = objectives[:, 0]
+        f2 = objectives[:, 1]
+        order = np.lexsort((f2, f1))
+
+        ranks = np.empty(len(objectives), dtype=np.int64)
+        front_keys: List[Tuple[float, float]] = []
+        for i, a, b in zip(order.tolist(), f1[order].tolist(), f2[order].tolist()):
+            key = (b, a)
+            k = bisect_left(front_keys, key)
+            if k == len(front_keys):
+                front_keys.append(key)
+            else:
+                front_keys[k] = key
+            ranks[i] = k
+
+        return ranks
+
+    @staticmethod
+    def domination_matrix_ranks(objectives: np.ndarray) -> np.ndarray:
+        # dominates[i, j]: i is no worse than j everywhere and better somewhere
+        a = objectives[:, None, :]
+        b = objectives[None, :, :]
+        dominates = np.all(a <= b, axis=2) & np.any(a < b, axis=2)
+
+        ranks = np.full(len(objectives), -1, dtype=np.int64)
+        domination_count = dominates.sum(axis=0)
+        remaining = np.ones(len(objectives), dtype=bool)
+
+        rank = 0
+        while remaining.any():
+            front = remaining & (domination_count == 0)
+            ranks[front] = rank
+            remaining &= ~front
+            domination_count -= dominates[front].sum(axis=0)
+            rank += 1
 
-    def run(self):
-        self.reset_genomes()
-        self.perform_domination_checks()
-        return self.build_fronts()
-
-    def perform_domination_checks(self):
-        for i in range(self.population_size):
-            for j in range(i + 1, self.population_size):
-                g1 = self.population[i]
-                g2 = self.population[j]
-                self.domination_check(g1, g2)
-                self.domination_check(g2, g1)
-
-    def domination_check(self, g1: Genome, g2: Genome):
-        g1_eval = g1.get_objectives()
-        g2_eval = g2.get_objectives()
-
-        maximize_mask = np.array([False, True])  # index 0: minimize, index 1: maximize
-        g1_norm = normalize_objectives(g1_eval, maximize_mask)
-        g2_norm = normalize_objectives(g2_eval, maximize_mask)
-
-        no_worse = np.all(g1_norm <= g2_norm)
-        strictly_better = np.any(g1_norm < g2_norm)
-
-        if no_worse and strictly_better:
-            g1.dominated_set.append(g2)
-            g2.domination_count += 1
-
-    def build_fronts(self):
-        fronts = [[]]
-        for genome in self.population:
-            if genome.domination_count == 0:
-                genome.rank = 0
-                fronts[0].append(genome)
-
-        i = 0
-        while fronts[i]:
-            next_front = []
-            for p in fronts[i]:
-                for q in p.dominated_set:
-                    q.domination_count -= 1
-                    if q.domination_count == 0:
-                        q.rank = i + 1
-                        next_front.append(q)
-            i += 1
-            fronts.append(next_front)
-
-        return fronts[:-1]
+        return ranks
@@ -1,20 +1,40 @@
 import os
 import random
 import numpy as np
-import matplotlib.pyplot as plt
 from globals import *
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from ga.genome import Genome
 from ga.genetic_algorithm import ProblemContext, GeneticAlgorithm
 from nsga.non_dominated_sorting import NonDominatedSorting
+from utils.helper import normalize_objectives
 from nsga.crowding_distance import CrowdingDistance
+from nsga.hypervolume import Hypervolume
+from nsga.offspring import OffspringProducer
 
 class NSGA2(GeneticAlgorithm):
-    def __init__(self, context: ProblemContext, population_size: int, max_generation: int, crossover_rate: float, mutation_rate: float, mutation_points: int, seed: List[np.ndarray] = None):
-        super().__init__(context, population_size, max_generation, crossover_rate, mutation_rate, mutation_points, seed)
+    def __init__(self, context: ProblemContext, population_size: int, max_generation: int, crossover_rate: float, mutation_rate: float, mutation_points: int, seed: List[np.ndarray] = None, population_folder: str = "population", offspring_workers: int = 0, offspring_seed: Optional[int] = None, profile_path: Optional[str] = None, stagnation_patience: int = STAGNATION_PATIENCE, stagnation_epsilon: float = STAGNATION_EPSILON, checkpoint_path: Optional[str] = None, checkpoint_interval: int = CHECKPOINT_INTERVAL, resume: bool = False):
+        super().__init__(context, population_size, max_generation, crossover_rate, mutation_rate, mutation_points, seed, population_folder, profile_path, checkpoint_path, checkpoint_interval, resume)
+
+        # Stop once the first front's hypervolume grew by less than
+        # stagnation_epsilon (relative) over stagnation_patience generations
+        self.stagnation_patience = stagnation_patience
+        self.stagnation_epsilon = stagnation_epsilon
+        self.hypervolume: dict[int, float] = {}
+        self.stopped_generation: Optional[int] = None
+
+        # offspring_workers=0 keeps the serial loop; >= 1 produces each parent
+        # pair from its own seed, in worker processes when > 1
+        self.offspring_workers = offspring_workers
+        if offspring_seed is None and offspring_workers > 0:
+            offspring_seed = int(np.random.randint(0, 2**31 - 1))
+        self.offspring_seed = offspring_seed
+        self.offspring_producer: Optional[OffspringProducer] = None
 
         self.fronts: List[List[Genome]] = [[]]
+        self.front_indices: List[np.ndarray] = []
+        self.ranks: np.ndarray = np.empty(0, dtype=np.int64)
+        self.objectives: np.ndarray = np.empty((0, 2))
 
     def plot_objective_space(
             self, 
@@ -24,140 +44,203 @@ class NSGA2(GeneticAlgorithm):
             color_by_rank: bool = False, 
             connect_by_rank: bool = False
         ):
+        # matplotlib is only imported when plotting in-process
+        from utils import plotting
 
         if population is None:
             population = self.population
 
-        f1_vals = [genome.calculate_average_distance() for genome in population]
-        f2_vals = [genome.calculate_average_size() for genome in population]
+        # Ranks of the plotted genomes only; population state is left alone
+        objectives = self.evaluate_population(population)
+        ranks, _ = NonDominatedSorting.sort(normalize_objectives(objectives, np.array([False, True])))
 
-        fig, ax = plt.subplots(figsize=(8, 6))
-
-        self.non_dominated_sorting()
-        if color_by_rank:
-            ranks = [genome.rank for genome in population]
-            scatter = ax.scatter(f1_vals, f2_vals, c=ranks, cmap='viridis', edgecolor='k', s=60)
-            cbar = fig.colorbar(scatter, ax=ax)
-            cbar.set_label('Pareto Rank')
-        else:
-            ax.scatter(f1_vals, f2_vals, color='blue', edgecolor='k', s=60)
-
-        if connect_by_rank:
-            from collections import defaultdict
-            fronts = defaultdict(list)
-            for genome in population:
-                fronts[genome.rank].append(genome)
-
-            for genomes_in_front in fronts.values():
-                sorted_front = sorted(genomes_in_front, key=Genome.calculate_average_distance)
-                x = [g.calculate_average_distance() for g in sorted_front]
-                y = [g.calculate_average_size() for g in sorted_front]
-                ax.plot(x, y, linestyle='--', linewidth=1, color='black')
-
-        info_text = (
-            f"Population size: {self.population_size}\n"
-            f"Max generation: {self.max_generation}\n"
-            f"Pareto front: {len(self.fronts[0])}\n"
-            f"Crossover rate: {self.crossover_rate}\n"
-            f"Mutation rate: {self.mutation_rate}\n"
-            f"Mutation points: {self.mutation_points}"
-        )
-
-        # Place the info text outside the axes area
-        fig.text(0.98, 0.02, info_text,
-                ha='right', va='bottom', fontsize=10,
-                bbox=dict(facecolor='white', edgecolor='gray', boxstyle='round,pad=0.3'))
-
-        ax.set_xlabel('Average Distance (m)')
-        ax.set_ylabel('Average Size (m^2)')
-        ax.set_title('Population Objective Space' + (' (Color by Rank)' if color_by_rank else ''))
-        ax.grid(True)
-        fig.tight_layout()
+        info = {
+            "Population size": self.population_size,
+            "Max generation": self.max_generation,
+            "Pareto front": int(np.count_nonzero(ranks == 0)),
+            **{k: v for k, v in self.plot_info().items() if k != "Population size"},
+        }
 
         folder = "fig/objective_space" if folder is None else folder
-        os.makedirs(folder, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = timestamp if filename is None else filename
-        fig.savefig(f"{folder}/{filename}.png")
-        # plt.show()
-        plt.close()
+        plotting.plot_objective_space(objectives, ranks, info, f"{folder}/{filename}.png", color_by_rank, connect_by_rank)
 
     def non_dominated_sorting(self, population: List[Genome] = None):
         if population is None:
             population = self.population
 
-        checker = NonDominatedSorting(population)
-        self.fronts = checker.run()
+        with self.profiler.phase("evaluation"):
+            self.objectives = self.evaluate_population(population)
+        with self.profiler.phase("sorting"):
+            checker = NonDominatedSorting(population, self.objectives)
+            self.fronts = checker.run()
+        self.front_indices = checker.front_indices
+        self.ranks = checker.ranks
 
-    def assign_crowding_distance(self):
-        for front in self.fronts:
-            CrowdingDistance(front).assign()
+    def assign_crowding_distance(self) -> List[np.ndarray]:
+        return [
+            CrowdingDistance(front, self.objectives[indices]).assign()
+            for front, indices in zip(self.fronts, self.front_indices)
+        ]
 
     def deduplicate_population(self, population: List[Genome]):
-        unique_population = []
-        seen = set()
-
-        for genome in population:
-            key = tuple(genome.chromosome.flatten())
-            if key not in seen:
-                seen.add(key)
-                unique_population.append(genome)
-
-        return unique_population
+        # Genomes hash and compare by chromosome content; the first copy wins
+        return list(dict.fromkeys(population))
 
     def select_next_generation(self) -> List[Genome]:
-        self.assign_crowding_distance()
+        with self.profiler.phase("crowding"):
+            crowding_distances = self.assign_crowding_distance()
 
         next_population = []
-        for front in self.fronts:
+        for front, distances in zip(self.fronts, crowding_distances):
             if len(next_population) + len(front) <= self.population_size:
                 next_population.extend(front)
             else:
-                sorted_front = sorted(front, key=lambda g: g.crowding_distance, reverse=True)
                 remaining = self.population_size - len(next_population)
-                next_population.extend(sorted_front[:remaining])
+                best = np.argpartition(-distances, remaining - 1)[:remaining]
+                next_population.extend(front[i] for i in best)
                 break
 
         return next_population
     
-    def evolve(self):
+    def produce_offspring_serial(self, parents: List[Genome]) -> List[Genome]:
         offspring = []
 
+        # Crossover
+        with self.profiler.phase("crossover"):
+            for i in range(0, len(parents), 2):
+                p1 = parents[i]
+                p2 = parents[i + 1]
+
+                identical = np.array_equal(p1.chromosome, p2.chromosome)
+                if random.random() < self.crossover_rate and not identical:
+                    child1 = self.crossover(p1.chromosome, p2.chromosome)
+                    child2 = self.crossover(p2.chromosome, p1.chromosome)
+                    offspring.append(Genome(child1, self.config))
+                    offspring.append(Genome(child2, self.config))
+                else:
+                    offspring.extend([p1.copy(), p2.copy()])
+
+        # Mutation
+        with self.profiler.phase("mutation"):
+            for genome in offspring:
+                if random.random() < self.mutation_rate:
+                    genome.mutate(self.mutation_points)
+
+        return offspring
+
+    def produce_offspring(self, parents: List[Genome]) -> List[Genome]:
+        if self.offspring_producer is None:
+            self.offspring_producer = OffspringProducer(self.config, self.offspring_workers, self.offspring_seed)
+
+        pairs = [(parents[i].chromosome, parents[i + 1].chromosome) for i in range(0, len(parents), 2)]
+        results = self.offspring_producer.produce(
+            pairs, self.generation, self.crossover_rate, self.mutation_rate, self.mutation_points
+        )
+
+        offspring = []
+        for result in results:
+            self.profiler.count("crossover_fallbacks", result.crossover_fallbacks)
+            for child, ok, obj in zip(result.children, result.feasible, result.objectives):
+                genome = Genome(child, self.config)
+                genome.set_evaluation(ok, obj)
+                offspring.append(genome)
+
+        return offspring
+
+    def evolve(self):
         # Selection
         parents = self.population
 
-        # Crossover
+        # Crossover, mutation
         np.random.shuffle(parents)
-        for i in range(0, len(parents), 2):
-            p1 = parents[i]
-            p2 = parents[i + 1]
-
-            identical = np.array_equal(p1.chromosome, p2.chromosome)
-            if random.random() < CROSSOVER_RATE and not identical:
-                child1 = self.crossover(p1.chromosome, p2.chromosome)
-                child2 = self.crossover(p2.chromosome, p1.chromosome)
-                offspring.append(Genome(child1, self.config))
-                offspring.append(Genome(child2, self.config))
-            else:
-                offspring.extend([Genome(p1.chromosome, self.config), Genome(p2.chromosome, self.config)])
-
-        # Mutation
-        for genome in offspring:
-            if random.random() < self.mutation_rate:
-                genome.mutate()
+        if self.offspring_workers > 0:
+            with self.profiler.phase("offspring"):
+                offspring = self.produce_offspring(parents)
+        else:
+            offspring = self.produce_offspring_serial(parents)
 
-        combined = self.population + offspring
-        combined = self.deduplicate_population(combined)
+        with self.profiler.phase("dedup"):
+            combined = self.population + offspring
+            combined = self.deduplicate_population(combined)
         if len(combined) < self.population_size:
             raise ValueError("Population size is not enough after deduplication")
 
         self.non_dominated_sorting(combined)
-        self.population = self.select_next_generation()
+        self.count_infeasible(offspring)
+        with self.profiler.phase("selection"):
+            self.population = self.select_next_generation()
         self.non_dominated_sorting()
 
-        self.eval()
+        with self.profiler.phase("evaluation"):
+            self.eval()
+            self.hypervolume[self.generation] = Hypervolume(self.fronts[0], self.objectives[self.front_indices[0]]).compute()
         self.generation += 1
 
+    def is_stagnant(self) -> bool:
+        if self.stagnation_patience <= 0 or len(self.hypervolume) <= self.stagnation_patience:
+            return False
+
+        history = list(self.hypervolume.values())
+        current = history[-1]
+        previous = history[-1 - self.stagnation_patience]
+        return current - previous <= self.stagnation_epsilon * abs(previous)
+
+    def checkpoint_state(self):
+        arrays, state = super().checkpoint_state()
+        arrays["ranks"] = np.array([-1 if genome.rank is None else genome.rank for genome in self.population])
+        state["hypervolume"] = self.hypervolume
+        state["stopped_generation"] = self.stopped_generation
+        state["offspring_seed"] = self.offspring_seed
+        return arrays, state
+
+    def load_checkpoint(self, path: Optional[str] = None) -> dict:
+        state = super().load_checkpoint(path)
+        self.hypervolume = {int(gen): hv for gen, hv in state["hypervolume"].items()}
+        self.stopped_generation = state["stopped_generation"]
+        self.offspring_seed = state["offspring_seed"]
+        self.non_dominated_sorting()
+        return state
+
+    def emigrants(self, count: int) -> List[Genome]:
+        # The most isolated members of the first front
+        front = self.fronts[0]
+        distances = CrowdingDistance.compute(self.objectives[self.front_indices[0]])
+        best = np.argsort(-distances, kind="stable")[:count]
+        return [front[i] for i in best.tolist()]
+
+    def immigrate(self, immigrants: List[Genome]):
+        # Immigrants compete with the population through the usual survivor selection
+        combined = self.deduplicate_population(self.population + immigrants)
+        self.non_dominated_sorting(combined)
+        self.population = self.select_next_generation()
+        self.non_dominated_sorting()
+
+    def finished(self) -> bool:
+        return self.generation >= self.max_generation or self.stopped_generation is not None
+
+    def step(self):
+        self.profiler.start_generation()
+        self.evolve()
+        if self.is_stagnant():
+            # The last generation evolved, as keyed in the fitness histories
+            self.stopped_generation = self.generation - 1
+            print(f"Stopped after generation {self.stopped_generation}: hypervolume gained less than {self.stagnation_epsilon:g} in {self.stagnation_patience} generations")
+        self.checkpoint_if_due()
+        self.profiler.end_generation(self.generation - 1)
+
+    def shutdown(self):
+        self.exporter.close()
+        self.profiler.close()
+        if self.offspring_producer is not None:
+            self.offspring_producer.shutdown()
+            self.offspring_producer = None
+
     def run(self):
-        for _ in range(self.max_generation):
-            self.evolve()
\ No newline at end of file
+        try:
+            while not self.finished():
+                self.step()
+        finally:
+            self.shutdown()
+        self.profiler.print_summary()
\ No newline at end of file
@@ -0,0 +1,102 @@
+import random
+import numpy as np
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from globals import Configuration
+from ga.batch_evaluator import BatchEvaluator
+from ga.crossover_operator import CrossoverOperator
+from ga.mutation_operator import MutationOperator
+
+@dataclass
+class OffspringTask:
+    parent1: np.ndarray
+    parent2: np.ndarray
+    seed: Tuple[int, ...]
+    crossover_rate: float
+    mutation_rate: float
+    mutation_points: int
+
+@dataclass
+class OffspringResult:
+    children: List[np.ndarray]
+    objectives: np.ndarray
+    feasible: np.ndarray
+    crossover_fallbacks: int = 0
+
+# Per-process state, filled once by init_offspring_worker
+_worker_config: Optional[Configuration] = None
+_worker_evaluator: Optional[BatchEvaluator] = None
+
+def init_offspring_worker(config: Configuration):
+    global _worker_config, _worker_evaluator
+    _worker_config = config
+    _worker_evaluator = BatchEvaluator(config)
+
+def produce_offspring(task: OffspringTask) -> OffspringResult:
+    # All randomness of a pair comes from its own seed, so the children do
+    # not depend on which process produced them
+    state = np.random.SeedSequence(task.seed).generate_state(2)
+    np.random.seed(int(state[0]))
+    random.seed(int(state[1]))
+
+    p1, p2 = task.parent1, task.parent2
+    identical = np.array_equal(p1, p2)
+    operator = CrossoverOperator(_worker_config)
+    if random.random() < task.crossover_rate and not identical:
+        children = [operator.run(p1, p2).copy(), operator.run(p2, p1).copy()]
+    else:
+        children = [p1.copy(), p2.copy()]
+
+    for k, child in enumerate(children):
+        if random.random() < task.mutation_rate:
+            children[k] = MutationOperator(child, task.mutation_points).mutate()
+
+    objectives, feasible = _worker_evaluator.evaluate(np.stack(children).astype(np.int16, copy=False))
+    return OffspringResult(children=children, objectives=objectives, feasible=feasible, crossover_fallbacks=operator.failures)
+
+class OffspringProducer:
+    def __init__(self, config: Configuration, workers: int, master_seed: int):
+        self.config = config
+        self.workers = workers
+        self.master_seed = master_seed
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+        if workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=init_offspring_worker,
+                initargs=(config,),
+            )
+
+    def produce(
+            self,
+            pairs: List[Tuple[np.ndarray, np.ndarray]],
+            generation: int,
+            crossover_rate: float,
+            mutation_rate: float,
+            mutation_points: int
+        ) -> List[OffspringResult]:
+        tasks = [
+            OffspringTask(p1, p2, (self.master_seed, generation, i), crossover_rate, mutation_rate, mutation_points)
+            for i, (p1, p2) in enumerate(pairs)
+        ]
+
+        if self.executor is not None:
+            chunksize = max(1, len(tasks) // (4 * self.workers))
+            return list(self.executor.map(produce_offspring, tasks, chunksize=chunksize))
+
+        # In-process: keep the caller's RNG streams untouched
+        random_state = random.getstate()
+        np_state = np.random.get_state()
+        try:
+            init_offspring_worker(self.config)
+            return [produce_offspring(task) for task in tasks]
+        finally:
+            random.setstate(random_state)
+            np.random.set_state(np_state)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,297 @@
+import os
+import json
+import time
+import random
+import shutil
+import numpy as np
+from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+from utils import io
+from globals import MUTATION_POINTS, PROFILE_PHASES, load_config
+from dataframes.subject import Subject
+from dataframes.curriculum import Curriculum
+from ga.genetic_algorithm import ProblemContext
+from ga.fitness_cache import fitness_cache
+from nsga.nsga import NSGA2
+
+SWEEP_NAME = "sweep.json"  # parameters, master seed and run settings of a sweep root
+
+@dataclass
+class SweepTask:
+    run_id: int
+    crossover_rate: float
+    mutation_rate: float
+    seed: Tuple[int, ...]
+
+# Per-process state, filled once by init_worker
+_worker_context: Optional[ProblemContext] = None
+_worker_seed: Optional[List[np.ndarray]] = None
+
+def load_problem(time_slot_count: int, room_count: int, seed_folder: Optional[str]) -> Tuple[ProblemContext, Optional[List[np.ndarray]]]:
+    subjects = Subject("csv/subjects.csv")
+    curriculum = Curriculum("csv/curriculum.csv", subjects.df)
+    context = ProblemContext(
+        curriculum=curriculum,
+        time_slot_indices=list(range(time_slot_count)),
+        room_indices=list(range(room_count)),
+        config=load_config(),
+    )
+    seed = io.import_population(seed_folder) if seed_folder else None
+    return context, seed
+
+def init_worker(time_slot_count: int, room_count: int, seed_folder: Optional[str]):
+    global _worker_context, _worker_seed
+    _worker_context, _worker_seed = load_problem(time_slot_count, room_count, seed_folder)
+
+def seed_rngs(seed: Tuple[int, ...]):
+    state = np.random.SeedSequence(seed).generate_state(2)
+    np.random.seed(int(state[0]))
+    random.seed(int(state[1]))
+
+def run_task(task: SweepTask, root: str, population_size: int, max_generation: int, mutation_points: int) -> dict:
+    seed_rngs(task.seed)
+    fitness_cache.reset_counters()
+    start = time.perf_counter()
+
+    # Everything is written to a scratch folder first and renamed into place
+    # once complete, so a crashed run never leaves a partial run_i behind.
+    # The checkpoint lives outside it so a rerun of the sweep picks it up.
+    run_folder = os.path.join(root, f"run_{task.run_id}")
+    tmp_folder = os.path.join(root, f".run_{task.run_id}.tmp{os.getpid()}")
+    checkpoint_path = os.path.join(root, f".run_{task.run_id}.checkpoint.npz")
+    shutil.rmtree(tmp_folder, ignore_errors=True)
+    try:
+        result = _run_in_folder(task, run_folder, tmp_folder, checkpoint_path, population_size, max_generation, mutation_points, start)
+    finally:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return result
+
+def build_nsga(task: SweepTask, tmp_folder: str, checkpoint_path: str, population_size: int, max_generation: int, mutation_points: int, resume: bool) -> NSGA2:
+    return NSGA2(
+        context=_worker_context,
+        population_size=population_size,
+        max_generation=max_generation,
+        crossover_rate=task.crossover_rate,
+        mutation_rate=task.mutation_rate,
+        mutation_points=mutation_points,
+        seed=_worker_seed,
+        population_folder=os.path.join(tmp_folder, "population"),
+        profile_path=os.path.join(tmp_folder, "profile.jsonl") if PROFILE_PHASES else None,
+        checkpoint_path=checkpoint_path,
+        resume=resume,
+    )
+
+def _run_in_folder(task: SweepTask, run_folder: str, tmp_folder: str, checkpoint_path: str, population_size: int, max_generation: int, mutation_points: int, start: float) -> dict:
+    resume = os.path.exists(checkpoint_path)
+    nsga = build_nsga(task, tmp_folder, checkpoint_path, population_size, max_generation, mutation_points, resume)
+
+    resumed_generation = None
+    if resume:
+        try:
+            nsga.load_checkpoint()
+            resumed_generation = nsga.generation
+        except ValueError as e:
+            # Start over exactly as a run that never had a checkpoint
+            print(f"Run {task.run_id}: discarding stale checkpoint: {e}")
+            os.remove(checkpoint_path)
+            nsga.shutdown()
+            seed_rngs(task.seed)
+            nsga = build_nsga(task, tmp_folder, checkpoint_path, population_size, max_generation, mutation_points, False)
+
+    nsga.run()
+
+    # Figures are drawn later from these arrays and stats.json (utils/plotting.py)
+    io.save_population_archive(
+        os.path.join(tmp_folder, io.FINAL_POPULATION_NAME),
+        np.stack([genome.chromosome for genome in nsga.population]),
+        objectives=nsga.objectives,
+        ranks=nsga.ranks,
+        metadata=nsga.archive_metadata(),
+    )
+
+    pareto_front = nsga.fronts[0]
+    nsga.export_population(pareto_front, folder=f"{tmp_folder}/pareto_front")
+    nsga.exporter.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "run_id": task.run_id,
+        "crossover_rate": task.crossover_rate,
+        "mutation_rate": task.mutation_rate,
+        "seed": list(task.seed),
+        "population_size": population_size,
+        "max_generation": max_generation,
+        "mutation_points": mutation_points,
+        "elapsed": elapsed,
+        "fitness_cache": fitness_cache.stats(),
+        "pareto_front": [genome.get_objectives().tolist() for genome in pareto_front],
+        "average_distance_fitness": {gen: asdict(s) for gen, s in nsga.average_distance_fitness.items()},
+        "average_size_fitness": {gen: asdict(s) for gen, s in nsga.average_size_fitness.items()},
+        "hypervolume": nsga.hypervolume,
+        "stopped_generation": nsga.stopped_generation,
+        "resumed_generation": resumed_generation,
+    }
+    with open(os.path.join(tmp_folder, "stats.json"), "w") as f:
+        json.dump(stats, f, indent=2)
+
+    shutil.rmtree(run_folder, ignore_errors=True)
+    os.replace(tmp_folder, run_folder)
+
+    return {"run_id": task.run_id, "pareto_front": len(pareto_front), "elapsed": elapsed}
+
+def render_run(folder: str):
+    # Runs in the plot process, the only one that imports matplotlib
+    from utils.plotting import render_run
+    return render_run(folder)
+
+def available_memory_mb() -> Optional[int]:
+    # Memory that can be allocated without swapping: MemAvailable counts
+    # reclaimable page cache, SC_AVPHYS_PAGES (free pages only) is the fallback
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def resolve_worker_count(workers: Optional[int], max_memory_per_worker: Optional[int]) -> int:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_memory_per_worker:
+        memory = available_memory_mb()
+        if memory is not None:
+            workers = min(workers, max(1, memory // max_memory_per_worker))
+    return max(1, workers)
+
+class ParameterSweep:
+    def __init__(
+            self,
+            params: List[Tuple[float, float]],
+            root: str = "simulation",
+            population_size: int = 100,
+            max_generation: int = 100,
+            mutation_points: int = MUTATION_POINTS,
+            time_slot_count: int = 15,
+            room_count: int = 16,
+            seed_folder: Optional[str] = "seed",
+            master_seed: Optional[int] = None,
+            workers: Optional[int] = None,
+            max_memory_per_worker: Optional[int] = None,
+            skip_existing: bool = True,
+            plot: bool = True
+        ):
+        self.params = params
+        self.root = root
+        self.population_size = population_size
+        self.max_generation = max_generation
+        self.mutation_points = mutation_points
+        self.time_slot_count = time_slot_count
+        self.room_count = room_count
+        self.seed_folder = seed_folder
+        self.master_seed = np.random.SeedSequence(master_seed).entropy
+        self.workers = resolve_worker_count(workers, max_memory_per_worker)
+        self.skip_existing = skip_existing
+        self.plot = plot
+
+    def settings(self) -> dict:
+        return {
+            "population_size": self.population_size,
+            "max_generation": self.max_generation,
+            "mutation_points": self.mutation_points,
+            "time_slot_count": self.time_slot_count,
+            "room_count": self.room_count,
+            "seed_folder": self.seed_folder,
+        }
+
+    def load_or_save_plan(self):
+        # The first start fixes the sampled params and master seed; a restart
+        # reuses them, so finished runs and checkpoints keep matching their run_id
+        path = os.path.join(self.root, SWEEP_NAME)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    "master_seed": self.master_seed,
+                    "params": [[float(c), float(m)] for c, m in self.params],
+                    **self.settings(),
+                }, f, indent=2)
+            os.replace(tmp_path, path)
+            return
+
+        with open(path) as f:
+            plan = json.load(f)
+        current = self.settings()
+        changed = [key for key in current if plan[key] != current[key]]
+        if changed:
+            details = ", ".join(f"{key} {plan[key]} != {current[key]}" for key in changed)
+            raise ValueError(f"{path} was written with other settings: {details}; use another output folder")
+        self.params = [tuple(p) for p in plan["params"]]
+        self.master_seed = plan["master_seed"]
+        print(f"Continuing the sweep in {self.root}: {len(self.params)} runs from {SWEEP_NAME}")
+
+    def build_tasks(self) -> List[SweepTask]:
+        # One independent stream per run, derived from (master_seed, run_id),
+        # so results do not depend on which worker picks the run up
+        tasks = []
+        for i, (crossover_rate, mutation_rate) in enumerate(self.params):
+            run_id = i + 1
+            if self.skip_existing and os.path.isdir(os.path.join(self.root, f"run_{run_id}")):
+                continue
+            tasks.append(SweepTask(
+                run_id=run_id,
+                crossover_rate=float(crossover_rate),
+                mutation_rate=float(mutation_rate),
+                seed=(self.master_seed, run_id),
+            ))
+        return tasks
+
+    def run(self) -> List[dict]:
+        os.makedirs(self.root, exist_ok=True)
+        self.load_or_save_plan()
+        tasks = self.build_tasks()
+        print(f"Sweep: {len(tasks)} runs on {self.workers} workers (master seed {self.master_seed})")
+
+        results = []
+        plots = {}
+        # Finished runs are drawn by one extra process while the sweep goes on
+        plotter = ProcessPoolExecutor(max_workers=1) if self.plot and tasks else None
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.time_slot_count, self.room_count, self.seed_folder),
+            ) as executor:
+                futures = {
+                    executor.submit(run_task, task, self.root, self.population_size, self.max_generation, self.mutation_points): task
+                    for task in tasks
+                }
+                for future in as_completed(futures):
+                    task = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Run {task.run_id} failed: {e}")
+                        continue
+                    results.append(result)
+                    print(f"Run {result['run_id']} done in {result['elapsed']:.1f}s, pareto front: {result['pareto_front']}")
+                    if plotter is not None:
+                        plots[task.run_id] = plotter.submit(render_run, os.path.join(self.root, f"run_{task.run_id}"))
+        finally:
+            if plotter is not None:
+                for run_id, future in plots.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Plotting run {run_id} failed: {e}")
+                plotter.shutdown()
+
+        return sorted(results, key=lambda r: r["run_id"])
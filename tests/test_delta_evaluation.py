@@ -0,0 +1,60 @@
+import random
+import numpy as np
+import pytest
+from globals import load_config
+from ga.genome import Genome
+from ga.batch_evaluator import BatchEvaluator
+from ga.fitness_cache import fitness_cache
+from ga.population_initializer import PopulationInitializer
+from dataframes.subject import Subject
+from dataframes.curriculum import Curriculum
+
+@pytest.fixture(scope="module")
+def problem():
+    subjects = Subject("csv/subjects.csv")
+    curriculum = Curriculum("csv/curriculum.csv", subjects.df)
+    config = load_config().select_rooms(list(range(16)))
+    chromosomes = PopulationInitializer(curriculum, list(range(15)), list(range(16))).generate(40, seed=7)
+    return config, chromosomes
+
+def full_evaluation(chromosome, config):
+    fitness_cache.clear()
+    genome = Genome(chromosome.copy(), config)
+    return genome.ensure_checked(), genome.calculate_average_distance(), genome.calculate_average_size()
+
+@pytest.mark.parametrize("seed", range(5))
+def test_delta_matches_full_evaluation(problem, seed):
+    config, chromosomes = problem
+    evaluator = BatchEvaluator(config)
+    np.random.seed(seed)
+    random.seed(seed)
+
+    checked = 0
+    for chromosome in chromosomes:
+        fitness_cache.clear()
+        genome = Genome(chromosome.copy(), config)
+        genome.calculate_average_distance()
+        genome.calculate_average_size()
+
+        # Random move sequences, applied through the delta path while the genome stays feasible
+        for _ in range(10):
+            if not genome.cached_check_constraint:
+                break
+            genome.mutate(random.randint(1, 8))
+            if genome.evaluation_state is None:
+                continue
+
+            feasible, distance, size = full_evaluation(genome.chromosome, config)
+            assert genome.cached_check_constraint == feasible
+            if not feasible:
+                continue
+            assert genome.cached_average_distance == distance
+            assert genome.cached_average_size == size
+
+            objectives, ok = evaluator.evaluate(genome.chromosome[None].astype(np.int16))
+            assert ok[0]
+            assert objectives[0, 0] == distance
+            assert objectives[0, 1] == size
+            checked += 1
+
+    assert checked > 0
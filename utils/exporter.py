@@ -0,0 +1,67 @@
+import atexit
+import queue
+import threading
+import weakref
+from typing import Callable, Optional
+
+class AsyncExporter:
+    """Run export jobs on a background thread behind a bounded queue.
+
+    submit() only blocks when the queue is full. flush() waits for every
+    pending job and re-raises the first error a job hit; close() also stops
+    the thread, which a later submit() starts again. Exporters that are
+    still alive at interpreter exit are closed by an atexit hook.
+    """
+
+    _live: "weakref.WeakSet[AsyncExporter]" = weakref.WeakSet()
+
+    def __init__(self, max_queue: int = 8):
+        self.queue: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue(maxsize=max_queue)
+        self.error: Optional[BaseException] = None
+        self.thread: Optional[threading.Thread] = None
+        AsyncExporter._live.add(self)
+
+    def _start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._work, name="population-exporter", daemon=True)
+            self.thread.start()
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                job()
+            except BaseException as e:
+                if self.error is None:
+                    self.error = e
+            finally:
+                self.queue.task_done()
+
+    def submit(self, job: Callable[[], None]):
+        # The job must only touch data snapshotted by the caller
+        self._start()
+        self.queue.put(job)
+
+    def flush(self):
+        if self.thread is not None:
+            self.queue.join()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def close(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.thread = None
+        self.flush()
+
+@atexit.register
+def _flush_live_exporters():
+    for exporter in list(AsyncExporter._live):
+        try:
+            exporter.close()
+        except Exception as e:
+            print(f"Population export failed: {e}")
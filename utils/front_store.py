@@ -0,0 +1,166 @@
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+from utils import io
+
+SHARD_PATTERN = "chromosomes_{:05d}.npy"
+INDEX_NAME = "index.csv"
+INDEX_COLUMNS = ["run_id", "shard", "crossover_rate", "mutation_rate", "average_distance", "average_size"]
+RUN_PATTERN = re.compile(r"run_(\d+)$")
+
+@dataclass
+class RunFront:
+    run_id: int
+    chromosomes: np.ndarray  # (N, T, R) int16
+    objectives: np.ndarray  # (N, 2), NaN when the run recorded none
+    crossover_rate: float
+    mutation_rate: float
+
+def find_runs(root: str) -> List[Tuple[int, str]]:
+    # (run_id, folder) of finished runs; scratch .run_i.tmp folders never match
+    runs = []
+    for name in os.listdir(root):
+        match = RUN_PATTERN.match(name)
+        if match and os.path.isdir(os.path.join(root, name, "pareto_front")):
+            runs.append((int(match.group(1)), os.path.join(root, name)))
+    return sorted(runs)
+
+def read_run(run_id: int, folder: str) -> Optional[RunFront]:
+    stats = {}
+    stats_path = os.path.join(folder, "stats.json")
+    if os.path.exists(stats_path):
+        with open(stats_path) as f:
+            stats = json.load(f)
+
+    front_folder = os.path.join(folder, "pareto_front")
+    archive_path = os.path.join(front_folder, io.ARCHIVE_NAME)
+    objectives = None
+    if os.path.exists(archive_path):
+        archive = io.load_population_archive(archive_path)
+        chromosomes = archive.chromosomes
+        if archive.objectives.shape == (len(chromosomes), 2):
+            objectives = archive.objectives
+    else:
+        arrays = io.import_all_txt_arrays(front_folder)
+        if not arrays:
+            print(f"Skipping run {run_id}: {front_folder} holds no chromosomes")
+            return None
+        chromosomes = np.stack(arrays)
+
+    # stats.json lists the front in export order
+    if objectives is None and len(stats.get("pareto_front", [])) == len(chromosomes):
+        objectives = np.asarray(stats["pareto_front"], dtype=float)
+    if objectives is None:
+        objectives = np.full((len(chromosomes), 2), np.nan)
+
+    return RunFront(
+        run_id=run_id,
+        chromosomes=np.asarray(chromosomes, dtype=np.int16),
+        objectives=objectives,
+        crossover_rate=float(stats.get("crossover_rate", np.nan)),
+        mutation_rate=float(stats.get("mutation_rate", np.nan)),
+    )
+
+class FrontStore:
+    """All collected Pareto fronts in one folder.
+
+    Each ingest writes its fronts as one new shard, chromosomes_NNNNN.npy
+    (int16, memory-mappable), and index.csv holds one row per member: run
+    id, shard, crossover/mutation rate and objectives, in shard order.
+    Existing shards are never rewritten. The shard is in place before the
+    index that lists it replaces the old one, so an interrupted ingest
+    leaves a consistent store behind.
+    """
+
+    def __init__(self, folder: str = "all_pareto_fronts"):
+        self.folder = folder
+        self.index_path = os.path.join(folder, INDEX_NAME)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.index_path)
+
+    def load_index(self) -> pd.DataFrame:
+        if not self.exists():
+            return pd.DataFrame(columns=INDEX_COLUMNS)
+        return pd.read_csv(self.index_path)
+
+    def iter_shards(self, mmap: bool = True) -> Iterator[Tuple[np.ndarray, pd.DataFrame]]:
+        # (chromosomes, index rows) per shard, one shard in memory at a time
+        index = self.load_index()
+        for shard, rows in index.groupby("shard", sort=True):
+            chromosomes = np.load(os.path.join(self.folder, shard), mmap_mode="r" if mmap else None)
+            yield chromosomes[:len(rows)], rows.reset_index(drop=True)
+
+    def load(self, mmap: bool = True) -> Tuple[np.ndarray, pd.DataFrame]:
+        # Every shard concatenated into one in-memory array
+        shards = list(self.iter_shards(mmap))
+        if not shards:
+            return np.empty((0, 0, 0), dtype=np.int16), self.load_index()
+        chromosomes = np.concatenate([chromosomes for chromosomes, _ in shards])
+        index = pd.concat([rows for _, rows in shards], ignore_index=True)
+        return chromosomes, index
+
+    def ingested_runs(self) -> set:
+        if not self.exists():
+            return set()
+        return set(pd.read_csv(self.index_path, usecols=["run_id"])["run_id"].tolist())
+
+    def ingest(self, root: str = "simulation", workers: Optional[int] = None) -> List[int]:
+        """Add the fronts of runs under root that are not in the store yet."""
+        done = self.ingested_runs()
+        runs = [(run_id, folder) for run_id, folder in find_runs(root) if run_id not in done]
+        if not runs:
+            return []
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and len(runs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(runs))) as executor:
+                fronts = list(executor.map(read_run, *zip(*runs)))
+        else:
+            fronts = [read_run(run_id, folder) for run_id, folder in runs]
+        fronts = [front for front in fronts if front is not None]
+        if not fronts:
+            return []
+
+        old_index = self.load_index()
+        shard = SHARD_PATTERN.format(old_index["shard"].nunique())
+        index = pd.DataFrame({
+            "run_id": np.concatenate([np.full(len(front.chromosomes), front.run_id) for front in fronts]),
+            "shard": shard,
+            "crossover_rate": np.concatenate([np.full(len(front.chromosomes), front.crossover_rate) for front in fronts]),
+            "mutation_rate": np.concatenate([np.full(len(front.chromosomes), front.mutation_rate) for front in fronts]),
+            "average_distance": np.concatenate([front.objectives[:, 0] for front in fronts]),
+            "average_size": np.concatenate([front.objectives[:, 1] for front in fronts]),
+        }, columns=INDEX_COLUMNS)
+        chromosomes = np.concatenate([front.chromosomes for front in fronts])
+
+        if len(old_index):
+            first = os.path.join(self.folder, old_index["shard"].iloc[0])
+            shape = np.load(first, mmap_mode="r").shape[1:]
+            if shape != chromosomes.shape[1:]:
+                raise ValueError(f"Chromosome shape {chromosomes.shape[1:]} does not match the store's {shape}")
+            index = pd.concat([old_index, index], ignore_index=True)
+
+        self.write(shard, chromosomes, index)
+        return [front.run_id for front in fronts]
+
+    def write(self, shard: str, chromosomes: np.ndarray, index: pd.DataFrame):
+        os.makedirs(self.folder, exist_ok=True)
+        pid = os.getpid()
+
+        # Shard first: a shard the index does not list is ignored and
+        # overwritten by the next ingest, so a crash only means re-ingesting
+        shard_path = os.path.join(self.folder, shard)
+        tmp_shard = f"{shard_path}.tmp{pid}.npy"
+        np.save(tmp_shard, chromosomes)
+        tmp_index = f"{self.index_path}.tmp{pid}"
+        index.to_csv(tmp_index, index=False)
+
+        os.replace(tmp_shard, shard_path)
+        os.replace(tmp_index, self.index_path)
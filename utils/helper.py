@@ -1,4 +1,5 @@
 import math
+import hashlib
 import numpy as np
 from globals import SLOTS_PER_DAY
 
@@ -14,6 +15,48 @@ def locate_twin(arr, val):
     twin_val = get_twin(arr, val)
     return locate_value(arr, twin_val) if twin_val else None
 
+def decode_chromosome(arr):
+    # Gene value layout: subject * 100 + parallel * 10 + session
+    subjects = arr // 100
+    parallels = (arr % 100) // 10
+    sessions = arr % 10
+    return subjects, parallels, sessions
+
+def get_twin_values(arr):
+    # Vectorized get_twin without the presence check
+    _, _, sessions = decode_chromosome(arr)
+    return np.where(sessions == 1, arr + 1, arr - 1)
+
+def chromosome_hash(arr: np.ndarray) -> int:
+    # 64-bit digest of the gene values; the shape is included so a reshaped
+    # chromosome never collides with the original
+    data = np.ascontiguousarray(arr, dtype=np.int16)
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(np.asarray(data.shape, dtype=np.int64).tobytes())
+    digest.update(data.tobytes())
+    return int.from_bytes(digest.digest(), "little")
+
+def config_fingerprint(
+    distance_matrix: np.ndarray,
+    size_vector: np.ndarray,
+    room_ids: tuple,
+    subject_ids: tuple,
+    parallel_counts: tuple,
+    total_duration: int,
+) -> int:
+    # 64-bit digest of everything an objective or the feasibility check reads:
+    # room data as float64 bytes and the curriculum as integers
+    digest = hashlib.blake2b(digest_size=8)
+    for matrix in (distance_matrix, size_vector):
+        data = np.ascontiguousarray(matrix, dtype=np.float64)
+        digest.update(np.asarray(data.shape, dtype=np.int64).tobytes())
+        digest.update(data.tobytes())
+    for values in (room_ids, subject_ids, parallel_counts, (total_duration,)):
+        data = np.asarray(values, dtype=np.int64)
+        digest.update(np.asarray(data.shape, dtype=np.int64).tobytes())
+        digest.update(data.tobytes())
+    return int.from_bytes(digest.digest(), "little")
+
 def is_schedule_violated(arr, val):    
     return np.any(arr) and np.any((arr != 0) & (arr != val))
 
@@ -40,6 +83,14 @@ def get_adjacent_classes(arr):
 
     return result
 
+def get_adjacent_rooms(rooms: np.ndarray):
+    # rooms: room per time slot of one parallel class config, -1 if empty
+    a = rooms[:-1]
+    b = rooms[1:]
+    same_day = (np.arange(1, len(rooms)) % SLOTS_PER_DAY) != 0
+    adjacent = same_day & (a != -1) & (b != -1)
+    return a[adjacent], b[adjacent]
+
 def haversine(point1: tuple[float, float], point2: tuple[int, int]):
     R = 6371000  # Earth radius in meters
 
@@ -56,6 +107,33 @@ def haversine(point1: tuple[float, float], point2: tuple[int, int]):
 
     return R * c
 
+def haversine_matrix(lats: np.ndarray, longs: np.ndarray) -> np.ndarray:
+    # Pairwise haversine distances, same formula as haversine
+    R = 6371000  # Earth radius in meters
+
+    phi = np.radians(np.asarray(lats, dtype=float))
+    lam = np.radians(np.asarray(longs, dtype=float))
+    dphi = phi[None, :] - phi[:, None]
+    dlambda = lam[None, :] - lam[:, None]
+
+    a = np.sin(dphi / 2)**2 + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin(dlambda / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return R * c
+
+def fixed_point(values, max_terms: int = 1 << 12) -> tuple[np.ndarray, float]:
+    # Integer multiples of the finest power-of-two step for which a sum of up
+    # to max_terms values stays below 2**53. Integer sums are exact whatever
+    # the order, and float(sum) is exact too. Values whose last bit lies below
+    # the step (float32 distances under ~2 mm) are rounded to it.
+    values = np.asarray(values, dtype=float)
+    largest = float(np.abs(values).max()) if values.size else 0.0
+    if largest == 0.0:
+        return np.zeros(values.shape, dtype=np.int64), 1.0
+    exponent = 53 - (max_terms - 1).bit_length() - math.frexp(largest)[1]
+    step = math.ldexp(1.0, -exponent)
+    return np.round(values / step).astype(np.int64), step
+
 def normalize_objectives(obj, maximize_mask: np.ndarray):
     # maximize_mask: a boolean array indicating which objectives to maximize
     return np.where(maximize_mask, -obj, obj)
@@ -0,0 +1,125 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, asdict
+from typing import Optional, Tuple
+from globals import SLOTS_PER_DAY
+
+# Campus centre the building clusters are scattered around (same area as csv/rooms.csv)
+CAMPUS_CENTER = (-6.8915, 107.6107)
+
+@dataclass
+class InstanceSpec:
+    subjects: int
+    classes: Tuple[int, int]  # (min, max) parallel classes per subject
+    credits: Tuple[int, int]  # (min, max) sessions per week per class
+    rooms: int
+    time_slots: int
+    buildings: int
+    seed: Optional[int] = None
+
+    @property
+    def days(self) -> int:
+        return self.time_slots // SLOTS_PER_DAY
+
+    def validate(self):
+        # generate_valid_guess places every subject's sessions on distinct days,
+        # in a row no other subject uses, and fails as soon as a visited day
+        # is full. With at most SLOTS_PER_DAY subjects a day can never fill up,
+        # whatever order subjects and days are visited in.
+        if not 1 <= self.subjects <= SLOTS_PER_DAY:
+            raise ValueError(f"subjects must be in [1, {SLOTS_PER_DAY}]: a time slot holds one subject")
+        if self.time_slots <= 0 or self.time_slots % SLOTS_PER_DAY != 0:
+            raise ValueError(f"time_slots must be a positive multiple of {SLOTS_PER_DAY}")
+        # Gene values encode parallel and session as single digits, and only
+        # sessions 1 and 2 are paired as twins
+        if not 1 <= self.classes[0] <= self.classes[1] <= min(9, self.rooms):
+            raise ValueError(f"classes must be within [1, {min(9, self.rooms)}]: all parallels of a session share one time slot")
+        if not 1 <= self.credits[0] <= self.credits[1] <= min(2, self.days):
+            raise ValueError(f"credits must be within [1, {min(2, self.days)}]")
+        if not 1 <= self.buildings <= self.rooms:
+            raise ValueError("buildings must be within [1, rooms]")
+
+def generate_instance(spec: InstanceSpec, folder: str) -> Tuple[str, str, str]:
+    """Write subjects.csv, curriculum.csv, rooms.csv and instance.json into folder."""
+    spec.validate()
+    rng = np.random.default_rng(spec.seed)
+
+    ids = np.arange(1, spec.subjects + 1)
+    subjects = pd.DataFrame({
+        "id": ids,
+        "code": [f"SY{1000 + i}" for i in ids],
+        "subject": [f"Synthetic Subject {i}" for i in ids],
+        "credits": rng.integers(spec.credits[0], spec.credits[1] + 1, size=spec.subjects),
+    })
+    curriculum = pd.DataFrame({
+        "id": ids,
+        "faculty_id": 1,
+        "subject_id": ids,
+        "classes": rng.integers(spec.classes[0], spec.classes[1] + 1, size=spec.subjects),
+    })
+
+    # Buildings within ~1 km of the centre; rooms of a building share its coordinates
+    offsets = rng.normal(scale=0.004, size=(spec.buildings, 2))
+    building_coords = np.asarray(CAMPUS_CENTER) + offsets
+    building_of_room = np.concatenate([
+        np.arange(spec.buildings),
+        rng.integers(0, spec.buildings, size=spec.rooms - spec.buildings),
+    ])
+    building_of_room.sort()
+
+    capacity = rng.integers(30, 250, size=spec.rooms)
+    ratio = np.round(rng.uniform(0.7, 1.7, size=spec.rooms), 2)
+    rooms = pd.DataFrame({
+        "id": np.arange(1, spec.rooms + 1),
+        "room_name": np.arange(9001, 9001 + spec.rooms),
+        "building": [f"Building {b + 1}" for b in building_of_room],
+        "capacity": capacity,
+        "size": np.round(capacity * ratio, 2),
+        "ratio": ratio,
+        "lat": building_coords[building_of_room, 0],
+        "long": building_coords[building_of_room, 1],
+    })
+
+    os.makedirs(folder, exist_ok=True)
+    paths = tuple(os.path.join(folder, name) for name in ("subjects.csv", "curriculum.csv", "rooms.csv"))
+    for df, path in zip((subjects, curriculum, rooms), paths):
+        df.to_csv(path, index=False)
+
+    with open(os.path.join(folder, "instance.json"), "w") as f:
+        json.dump({**asdict(spec), "total_duration": int((curriculum["classes"] * subjects["credits"]).sum())}, f, indent=2)
+
+    return paths
+
+def parse_range(text: str) -> Tuple[int, int]:
+    # "6" or "4-6"
+    low, _, high = text.partition("-")
+    return int(low), int(high or low)
+
+if __name__ == "__main__":
+    import argparse
+
+    # python -m utils.instance_generator csv/synthetic --rooms 200 --time-slots 25
+    parser = argparse.ArgumentParser(description="Write a synthetic subjects/curriculum/rooms CSV set")
+    parser.add_argument("folder")
+    parser.add_argument("--subjects", type=int, default=SLOTS_PER_DAY)
+    parser.add_argument("--classes", type=parse_range, default=(4, 6), help="parallel classes per subject, N or MIN-MAX")
+    parser.add_argument("--credits", type=parse_range, default=(1, 2), help="sessions per class, N or MIN-MAX")
+    parser.add_argument("--rooms", type=int, default=86)
+    parser.add_argument("--time-slots", type=int, default=15)
+    parser.add_argument("--buildings", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    spec = InstanceSpec(
+        subjects=args.subjects,
+        classes=args.classes,
+        credits=args.credits,
+        rooms=args.rooms,
+        time_slots=args.time_slots,
+        buildings=args.buildings,
+        seed=args.seed,
+    )
+    for path in generate_instance(spec, args.folder):
+        print(f"Wrote {path}")
@@ -1,6 +1,22 @@
 import os
 import ast
+import json
 import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+ARCHIVE_NAME = "population.npz"
+FINAL_POPULATION_NAME = "final_population.npz"  # last population of a sweep run, with objectives and ranks
+
+@dataclass
+class PopulationArchive:
+    chromosomes: np.ndarray  # (N, T, R) int16
+    objectives: np.ndarray  # (N, M) float64, empty if not evaluated
+    ranks: np.ndarray  # (N,) int64, -1 if unranked
+    metadata: dict = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.chromosomes)
 
 def export_to_txt(arr, folder="solutions", filename="solution.txt"):
     # Ensure the folder exists
@@ -60,3 +76,89 @@ def import_all_txt_arrays(folder):
                 print(f"Failed to import '{filename}': {e}")
 
     return arrays
+
+
+def save_population_archive(
+    path,
+    chromosomes,
+    objectives: Optional[np.ndarray] = None,
+    ranks: Optional[np.ndarray] = None,
+    metadata: Optional[dict] = None,
+):
+    chromosomes = np.asarray(chromosomes, dtype=np.int16)
+    N = len(chromosomes)
+    objectives = np.empty((N, 0)) if objectives is None else np.asarray(objectives, dtype=float)
+    ranks = np.full(N, -1, dtype=np.int64) if ranks is None else np.asarray(ranks, dtype=np.int64)
+
+    _savez_atomic(
+        path,
+        chromosomes=chromosomes,
+        objectives=objectives,
+        ranks=ranks,
+        metadata=np.array(json.dumps(metadata or {})),
+    )
+
+def _savez_atomic(path, **arrays):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    # Write next to the target and rename, so readers never see a partial file
+    tmp_path = f"{path}.tmp{os.getpid()}.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+def load_population_archive(path) -> PopulationArchive:
+    with np.load(path, allow_pickle=False) as data:
+        return PopulationArchive(
+            chromosomes=data["chromosomes"],
+            objectives=data["objectives"],
+            ranks=data["ranks"],
+            metadata=json.loads(str(data["metadata"])),
+        )
+
+def save_checkpoint(path, arrays: Dict[str, np.ndarray], state: dict):
+    # state must be JSON serialisable; floats round-trip exactly through json
+    _savez_atomic(path, state=np.array(json.dumps(state)), **arrays)
+
+def load_checkpoint(path) -> Tuple[Dict[str, np.ndarray], dict]:
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files if key != "state"}
+        state = json.loads(str(data["state"]))
+    return arrays, state
+
+def import_population(path) -> List[np.ndarray]:
+    # Accepts an archive file, or a folder of archives or of .txt chromosomes.
+    # A folder holding archives is read from them alone: its .txt files are
+    # taken to be the archive's source (see convert_txt_folder)
+    if os.path.isfile(path):
+        return list(load_population_archive(path).chromosomes)
+
+    arrays = []
+    for filename in sorted(os.listdir(path)):
+        if filename.endswith(".npz"):
+            arrays.extend(load_population_archive(os.path.join(path, filename)).chromosomes)
+    if arrays:
+        return arrays
+    return import_all_txt_arrays(path)
+
+def convert_txt_folder(folder, path=None, metadata: Optional[dict] = None) -> str:
+    path = os.path.join(folder, ARCHIVE_NAME) if path is None else path
+    arrays = import_all_txt_arrays(folder)
+    if not arrays:
+        raise ValueError(f"No .txt chromosomes found in '{folder}'")
+
+    metadata = {"source": folder, **(metadata or {})}
+    save_population_archive(path, np.stack(arrays), metadata=metadata)
+    return path
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m utils.io <txt_folder> [archive.npz]
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.io <txt_folder> [archive.npz]")
+        sys.exit(1)
+
+    out = convert_txt_folder(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Wrote {out}")
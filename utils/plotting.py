@@ -0,0 +1,154 @@
+import os
+import json
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+from utils import io
+
+# Renders figures from saved arrays only; the solver never imports this module
+
+TYPE_TO_YLABEL = {
+    "room_count": "Room Count",
+    "average_distance": "Average Distance (m)",
+    "average_size": "Average Room Size (m^2)"
+}
+
+TYPE_TO_TITLE = {
+    "room_count": "Room Count",
+    "average_distance": "Average Distance",
+    "average_size": "Average Room Size"
+}
+
+def info_text(info: Dict[str, object]) -> str:
+    return "\n".join(f"{label}: {value}" for label, value in info.items())
+
+def plot_fitness_history(history: Dict[int, dict], type: str, info: Dict[str, object], path: str):
+    # history: generation -> {"best", "worst", "average"}
+    if type not in TYPE_TO_TITLE:
+        raise ValueError("Invalid evaluation type")
+
+    x = sorted(history)
+    best = [history[i]["best"] for i in x]
+    worst = [history[i]["worst"] for i in x]
+    average = [history[i]["average"] for i in x]
+
+    plt.figure(figsize=(10, 6))
+    plt.plot(x, best, label='Best Fitness')
+    plt.plot(x, worst, label='Worst Fitness')
+    plt.plot(x, average, label='Average Fitness')
+
+    plt.text(0.01, 0.02, info_text(info), transform=plt.gca().transAxes,
+            fontsize=10, verticalalignment='bottom', horizontalalignment='left',
+            bbox=dict(facecolor='white', edgecolor='gray', boxstyle='round,pad=0.3'))
+
+    plt.xlabel("Generation")
+    plt.ylabel(TYPE_TO_YLABEL[type])
+    plt.title(f"{TYPE_TO_TITLE[type]} Fitness Evaluation Over Generations")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    plt.savefig(path)
+    plt.close()
+
+def plot_objective_space(
+        objectives: np.ndarray,
+        ranks: np.ndarray,
+        info: Dict[str, object],
+        path: str,
+        color_by_rank: bool = False,
+        connect_by_rank: bool = False
+    ):
+    # objectives: (N, 2) average distance and size, ranks: (N,) Pareto ranks
+    fig, ax = plt.subplots(figsize=(8, 6))
+
+    if color_by_rank:
+        scatter = ax.scatter(objectives[:, 0], objectives[:, 1], c=ranks, cmap='viridis', edgecolor='k', s=60)
+        cbar = fig.colorbar(scatter, ax=ax)
+        cbar.set_label('Pareto Rank')
+    else:
+        ax.scatter(objectives[:, 0], objectives[:, 1], color='blue', edgecolor='k', s=60)
+
+    if connect_by_rank:
+        for rank in np.unique(ranks).tolist():
+            front = objectives[ranks == rank]
+            front = front[np.argsort(front[:, 0], kind="stable")]
+            ax.plot(front[:, 0], front[:, 1], linestyle='--', linewidth=1, color='black')
+
+    # Place the info text outside the axes area
+    fig.text(0.98, 0.02, info_text(info),
+            ha='right', va='bottom', fontsize=10,
+            bbox=dict(facecolor='white', edgecolor='gray', boxstyle='round,pad=0.3'))
+
+    ax.set_xlabel('Average Distance (m)')
+    ax.set_ylabel('Average Size (m^2)')
+    ax.set_title('Population Objective Space' + (' (Color by Rank)' if color_by_rank else ''))
+    ax.grid(True)
+    fig.tight_layout()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fig.savefig(path)
+    plt.close(fig)
+
+def render_run(folder: str) -> List[str]:
+    """Draw a finished run's figures from its stats.json and final population."""
+    with open(os.path.join(folder, "stats.json")) as f:
+        stats = json.load(f)
+
+    settings = {
+        "Population size": stats["population_size"],
+        "Crossover rate": stats["crossover_rate"],
+        "Mutation rate": stats["mutation_rate"],
+        "Mutation points": stats["mutation_points"],
+    }
+    paths = []
+
+    archive_path = os.path.join(folder, io.FINAL_POPULATION_NAME)
+    if os.path.exists(archive_path):
+        archive = io.load_population_archive(archive_path)
+        info = {
+            "Population size": stats["population_size"],
+            "Max generation": stats["max_generation"],
+            "Pareto front": int(np.count_nonzero(archive.ranks == 0)),
+            **{k: v for k, v in settings.items() if k != "Population size"},
+        }
+        path = os.path.join(folder, "objective_space", "after.png")
+        plot_objective_space(archive.objectives, archive.ranks, info, path, connect_by_rank=True)
+        paths.append(path)
+
+    for type in ("average_distance", "average_size"):
+        history = {int(gen): s for gen, s in stats.get(f"{type}_fitness", {}).items()}
+        if history:
+            path = os.path.join(folder, "evaluation", f"{type}.png")
+            plot_fitness_history(history, type, settings, path)
+            paths.append(path)
+
+    return paths
+
+if __name__ == "__main__":
+    import argparse
+    from concurrent.futures import as_completed
+    from utils.front_store import find_runs
+
+    # python -m utils.plotting simulation/run_3 ... | --root simulation
+    parser = argparse.ArgumentParser(description="Re-render run figures from saved stats and arrays")
+    parser.add_argument("folders", nargs="*")
+    parser.add_argument("--root", type=str, default=None, help="render every run_* under this folder")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    folders = list(args.folders)
+    if args.root:
+        folders += [folder for _, folder in find_runs(args.root)]
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(render_run, folder): folder for folder in folders}
+        for future in as_completed(futures):
+            try:
+                print(f"{futures[future]}: {len(future.result())} figures")
+            except Exception as e:
+                print(f"{futures[future]}: failed: {e}")
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import contextlib
+from collections import defaultdict
+from typing import Dict, Optional
+
+_DISABLED = contextlib.nullcontext()
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "PhaseProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.times[self.name] += time.perf_counter() - self.start
+        self.profiler.calls[self.name] += 1
+        return False
+
+class PhaseProfiler:
+    """Per-generation wall time and call counts of named phases.
+
+    Phases may nest (e.g. repair inside crossover), so their times are not
+    additive. Each end_generation() appends one JSON line to path. Without
+    a path the profiler is disabled and phase()/count() do nothing.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.enabled = path is not None
+        self.file = None
+
+        self.times: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.generation_start = time.perf_counter()
+
+        self.total_times: Dict[str, float] = defaultdict(float)
+        self.total_calls: Dict[str, int] = defaultdict(int)
+        self.total_counters: Dict[str, int] = defaultdict(int)
+        self.generations = 0
+        self.total_wall = 0.0
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return _DISABLED
+        return _Phase(self, name)
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def start_generation(self):
+        # Drops anything recorded between generations
+        self.times.clear()
+        self.calls.clear()
+        self.counters.clear()
+        self.generation_start = time.perf_counter()
+
+    def end_generation(self, generation: int):
+        if not self.enabled:
+            return
+
+        wall = time.perf_counter() - self.generation_start
+        record = {
+            "generation": generation,
+            "wall": wall,
+            "phases": {name: {"time": self.times[name], "calls": self.calls[name]} for name in self.times},
+            "counters": dict(self.counters),
+        }
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.file = open(self.path, "a")
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+        for name, value in self.times.items():
+            self.total_times[name] += value
+            self.total_calls[name] += self.calls[name]
+        for name, value in self.counters.items():
+            self.total_counters[name] += value
+        self.generations += 1
+        self.total_wall += wall
+
+        self.start_generation()
+
+    def summary(self) -> dict:
+        return {
+            "generations": self.generations,
+            "wall": self.total_wall,
+            "phases": {
+                name: {"time": value, "calls": self.total_calls[name]}
+                for name, value in sorted(self.total_times.items(), key=lambda item: -item[1])
+            },
+            "counters": dict(self.total_counters),
+        }
+
+    def print_summary(self):
+        if not self.enabled or self.generations == 0:
+            return
+
+        summary = self.summary()
+        wall = summary["wall"]
+        print(f"\nPhase timing over {self.generations} generations ({wall:.3f} s)")
+        print(f"{'phase':<22} {'time s':>10} {'% wall':>7} {'calls':>8} {'ms/gen':>9}")
+        for name, stats in summary["phases"].items():
+            share = 100 * stats["time"] / wall if wall else 0.0
+            print(f"{name:<22} {stats['time']:>10.3f} {share:>6.1f}% {stats['calls']:>8} {1e3 * stats['time'] / self.generations:>9.2f}")
+        for name, value in summary["counters"].items():
+            print(f"{name:<22} {value:>10}")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None